@@ -174,6 +174,12 @@ class ConfigManager:
 
     def set_logger(self, log_callback = print):
         self.log = log_callback
+
+    @property
+    def mtime_ns(self) -> int:
+        """st_mtime_ns của file config ở lần load gần nhất (-1 nếu chưa load được).
+        Không stat: caller gọi reload_if_changed() trước rồi so sánh giá trị này."""
+        return self._mtime_ns
     
     def get_logger(self):
         return self.log
@@ -464,7 +470,6 @@ class ConfigManager:
             v = mkv.group(2).strip()
             pairs.append((k, v))
 
-        import re
         mos: dict[int, str] = {}
         for k, v in pairs:
             m = re.match(r"^mo(\d+)$", (k or "").strip(), flags=re.IGNORECASE)
@@ -493,7 +498,6 @@ class ConfigManager:
         return self._latest_mo or ""
 
     def add_mo(self, mo_value: str, *, persist: bool = True) -> bool:
-        import re
         v = re.sub(r"\s+", "", (mo_value or "")).strip()
         if not v:
             return False
@@ -545,7 +549,6 @@ class ConfigManager:
         return self._mo_picker.LAST_SELECTED_MO if self._mo_picker else ""
 
     def set_last_selected_mo(self, mo_value: str, *, persist: bool = True) -> bool:
-        import re
         v = re.sub(r"\s+", "", (mo_value or "")).strip()
         if not v:
             return False
@@ -603,7 +606,6 @@ class ConfigManager:
             v = mkv.group(2).strip()
             pairs.append((k, v))
 
-        import re
         h_codes: dict[int, str] = {}
         for k, v in pairs:
             m = re.match(r"^h_code(\d+)$", (k or "").strip(), flags=re.IGNORECASE)
@@ -632,7 +634,6 @@ class ConfigManager:
         return self._latest_h_code or ""
 
     def add_h_code(self, h_code_value: str, *, persist: bool = True) -> bool:
-        import re
         v = re.sub(r"\s+", "", (h_code_value or "")).strip()
         if not v:
             return False
@@ -684,7 +685,6 @@ class ConfigManager:
         return self._h_code_picker.LAST_SELECTED_H_CODE if self._h_code_picker else ""
 
     def set_last_selected_h_code(self, h_code_value: str, *, persist: bool = True) -> bool:
-        import re
         v = re.sub(r"\s+", "", (h_code_value or "")).strip()
         if not v:
             return False
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import re
 import sys
 import time
 import random
@@ -502,7 +503,6 @@ class ModelEditDialog(ttk.Frame):
         model_id = (self.v_model_id.get() or "").strip()
         needpsn  = (self.v_needpsn.get() or "").strip()
 
-        import re
         if not model_id:
             self.lbl_err.configure(text="MODEL ID không được trống.")
             return
@@ -741,6 +741,26 @@ def find_needpsn(text: str) -> str | None:
     m = _RX_NEEDPSN.search(text or "")
     return m.group(0).upper() if m else None
 
+# one sweep for status + NEEDPSN: group 1 = FAIL tokens, 2 = PASS tokens, 3 = NEEDPSNxx
+_RX_CLASSIFY = re.compile(r"(PASSED=0|FAIL|ERRO)|(PASSED=1|(?<= )PASS|PASS\Z)|(NEEDPSN\d+)", re.IGNORECASE)
+
+def classify(line: str) -> tuple[str | None, str | None]:
+    """(infer_status(line), find_needpsn(line)) in a single regex pass."""
+    status = None
+    needpsn = None
+    for m in _RX_CLASSIFY.finditer(line or ""):
+        g = m.lastindex
+        if g == 1:
+            status = "FAIL"  # ưu tiên FAIL trước
+        elif g == 2:
+            if status is None:
+                status = "PASS"
+        elif needpsn is None:
+            needpsn = m.group(3).upper()
+        if status == "FAIL" and needpsn is not None:
+            break
+    return status, needpsn
+
 # -----------------------------
 # Main App
 # -----------------------------
@@ -974,8 +994,8 @@ class LASERLINKAPP(tk.Tk):
 
         # 1) init logger hub
         self.logger, self.log_buff = build_log_buffer("LASERLINK", max_buffer=5000)
-        # track last log object rendered (IMPORTANT for trimmed ring-buffer)
-        self._last_log_obj = None
+        # cursor = handler.seq already shown in the Text widget (IMPORTANT for trimmed ring-buffer)
+        self._log_cursor: int = 0
 
         # 2) attach CFG logging -> goes into logger -> into log_buff
         self.cfg = CFG
@@ -1342,7 +1362,6 @@ class LASERLINKAPP(tk.Tk):
             self._v_mo_status.set("CFG chưa hỗ trợ MO (thiếu CFG.add_mo).")
             return
 
-        import re
         raw = self._v_mo.get() or ""
         mo = re.sub(r"\s+", "", raw).strip()
         if len(mo) > 21:
@@ -1564,7 +1583,8 @@ class LASERLINKAPP(tk.Tk):
                 return fail("SFC_MO_H", "SFC no response / timeout", resp1)
 
             
-            st1 = infer_status(resp1) or "UNKNOWN"
+            st1, needpsn1 = classify(resp1)
+            st1 = st1 or "UNKNOWN"
             emit("LOG", text=f"[SFC][MO,H] {resp1}")
             if st1 == "FAIL":
                 return fail("SFC_MO_H", "SFC returned FAIL", resp1)
@@ -1572,7 +1592,7 @@ class LASERLINKAPP(tk.Tk):
             # ---------------- 2) SFC: MO,NEEDPSNxx ----------------
             # nếu needpsn không có từ model mapping -> thử parse từ resp1
             if not needpsn:
-                needpsn = find_needpsn(resp1) or ""
+                needpsn = needpsn1 or ""
             if not needpsn:
                 # bạn có thể đổi thành FAIL hoặc WARN tùy spec; mình fail để khỏi chạy sai
                 return fail("NEEDPSN", f"Missing NEEDPSN for model={model}", resp1)
@@ -1788,41 +1808,32 @@ class LASERLINKAPP(tk.Tk):
     def _pump_log_buffer(self):
         try:
             buf = getattr(self, "log_buff", None)
-            if not buf:
+            handler = getattr(self.logger, "_laserlink_handler", None)
+            # nothing logged since the last tick -> one int compare, no lock / buffer walk
+            if not buf or handler is None or handler.seq == self._log_cursor:
                 return
 
             lock = getattr(self.logger, "_laserlink_lock", None)
 
             def compute_new_lines():
                 MAX_PUSH_PER_TICK = 250
-                last_obj = getattr(self, "_last_log_obj", None)
-
-                if last_obj is None:
-                    nl = buf[-MAX_PUSH_PER_TICK:]
-                else:
-                    idx = -1
-                    for i in range(len(buf) - 1, -1, -1):
-                        if buf[i] is last_obj:
-                            idx = i
-                            break
-                    nl = buf[idx + 1:] if idx >= 0 else buf[-MAX_PUSH_PER_TICK:]
-
-                if len(nl) > MAX_PUSH_PER_TICK:
-                    nl = nl[-MAX_PUSH_PER_TICK:]
-
-                new_last = buf[-1] if buf else last_obj
-                return list(nl), new_last
+                seq = handler.seq
+                n = len(buf)
+                # lines written since the cursor, clamped to what the buffer still holds
+                k = min(seq - self._log_cursor, n, MAX_PUSH_PER_TICK)
+                # log_buff is a deque: index only the last k items (deque indexes from the nearer end)
+                nl = [buf[i] for i in range(n - k, n)] if k > 0 else []
+                return nl, seq
 
             if lock:
                 with lock:
-                    new_lines, new_last = compute_new_lines()
+                    new_lines, seq = compute_new_lines()
             else:
-                new_lines, new_last = compute_new_lines()
+                new_lines, seq = compute_new_lines()
 
+            self._log_cursor = seq
             if new_lines:
-                for line in new_lines:
-                    self._append_log_view(line)
-                self._last_log_obj = new_last
+                self._append_log_lines(new_lines)
 
         finally:
             self.after(100, self._pump_log_buffer)
@@ -1844,10 +1855,22 @@ class LASERLINKAPP(tk.Tk):
         """
         UI-only: must be called in Tk main thread.
         """
-        line = (s or "").rstrip() + "\n"
+        self._append_log_lines([s])
+
+    def _append_log_lines(self, lines: list[str]) -> None:
+        """
+        UI-only: append a batch of lines with one insert / trim / see (not per line).
+        """
+        if not lines:
+            return
+        # lines that would be trimmed right away anyway -> never hand them to Tk
+        if len(lines) > self._log_max_lines:
+            lines = lines[-self._log_max_lines:]
+
+        chunk = "".join((s or "").rstrip() + "\n" for s in lines)
         self.log.configure(state="normal")
-        self.log.insert("end", line)
-        self._log_lines += 1
+        self.log.insert("end", chunk)
+        self._log_lines += len(lines)
 
         if self._log_lines > self._log_max_lines:
             extra = self._log_lines - self._log_max_lines
@@ -2106,7 +2129,7 @@ class LASERLINKAPP(tk.Tk):
 
     def _open_flow_core_loop(self) -> None:
         """Background loop: keep COM_LASER opened, read lines, emit H into _oflow_q."""
-        last_err_ts = 0.0
+        last_err_ts = float("-inf")  # monotonic clock: immune to wall-clock/NTP steps
 
         while True:
             if self._oflow_stop_evt.is_set():
@@ -2171,10 +2194,7 @@ class LASERLINKAPP(tk.Tk):
                 if not raw:
                     continue
 
-                try:
-                    line = raw.decode("utf-8", errors="ignore")
-                except Exception:
-                    line = str(raw)
+                line = raw.decode("utf-8", errors="ignore")  # errors="ignore" never raises
 
                 cleaned = line.replace("\r", "").replace("\n", "").strip()
                 if not cleaned:
@@ -2192,7 +2212,7 @@ class LASERLINKAPP(tk.Tk):
                     pass
 
             except Exception as e:
-                now = time.time()
+                now = time.monotonic()
                 if now - last_err_ts > 2.0:
                     last_err_ts = now
                     try:
@@ -22,11 +22,13 @@ from __future__ import annotations
 
 import threading
 import tkinter as tk
+from array import array
+from bisect import bisect_right
 from tkinter import ttk
 from collections import OrderedDict, deque
 from dataclasses import dataclass
 from datetime import datetime, date, time as dtime, timedelta
-from typing import Deque, Dict, Iterable, List, Optional, Tuple
+from typing import Deque, Dict, Iterable, List, Optional, Sized, Tuple
 
 try:
     from PIL import Image, ImageDraw, ImageTk  # type: ignore
@@ -35,9 +37,22 @@ except Exception:
     _HAS_PIL = False
 
 
+# dirty bits for KPIWidget._refresh_ui (what needs to be pushed to Tk)
+_DIRTY_AVG = 1
+_DIRTY_SHIFT = 2
+_DIRTY_HOUR = 4
+_DIRTY_DONUT = 8
+_DIRTY_ALL = _DIRTY_AVG | _DIRTY_SHIFT | _DIRTY_HOUR | _DIRTY_DONUT
+
+
 def _safe_avg(values: Iterable[float]) -> Optional[float]:
-    vals = list(values) if values is not None else []
-    return (sum(vals) / len(vals)) if vals else None
+    if values is None:
+        return None
+    # list/tuple/deque: sum() + len() run in C directly, no intermediate copy
+    if not isinstance(values, Sized):
+        values = list(values)
+    n = len(values)
+    return (sum(values) / n) if n else None
 
 
 def _floor_hour(ts: datetime) -> datetime:
@@ -56,6 +71,15 @@ class KPIEvent:
 class KPIWidget(ttk.Frame):
     _DAY_START = dtime(7, 30)
     _NIGHT_START = dtime(19, 30)
+    # same boundaries as minute-of-day ints (hot path compares ints, not dtime objects)
+    _DAY_START_MIN = _DAY_START.hour * 60 + _DAY_START.minute
+    _NIGHT_START_MIN = _NIGHT_START.hour * 60 + _NIGHT_START.minute
+    # clock-hour slots of one KPI day: 07:xx .. 06:xx, plus slot 24 for 07:00-07:29 of the next day
+    _HOUR_SLOTS = 25
+
+    # label templates (built once, only the numbers vary per event)
+    _SHIFT_FMT = "{day} | DAY {dp}/{dt} ({dy:.1f}%)  | NIGHT {np}/{nt} ({ny:.1f}%)"
+    _HOUR_FMT = "pass ({a:%H:%M}–{b:%H:%M}): {n}"
 
     def __init__(
         self,
@@ -110,6 +134,9 @@ class KPIWidget(ttk.Frame):
         self._prod_style = f"KPI.Prod.{id(self)}.TLabel"
         self._shift_style = f"KPI.Shift.{id(self)}.TLabel"
 
+        # last (date -> "YYYY-MM-DD") formatted; bursts of events share the same date
+        self._iso_cache: Tuple[Optional[date], str] = (None, "")
+
         # KPI-day stores (OrderedDict to evict oldest)
         self._days: "OrderedDict[str, dict]" = OrderedDict()
         self._active_day: str = self._calc_kpi_day_key(datetime.now())
@@ -119,8 +146,21 @@ class KPIWidget(ttk.Frame):
         self._rep_pass = 0
         self._rep_total = 0
         self._avg_cycle: Optional[float] = None
+        # derived from _rep_pass/_rep_total, refreshed only when totals change
+        self._pass_rate = 0.0
+        self._pass_pct: Optional[int] = None
 
         self._imgtk = None
+        # (size, pass_rate, theme...) of what the donut canvas currently shows
+        self._donut_key: Optional[tuple] = None
+
+        # last text pushed into each StringVar / more_lbl state (skip Tcl SetVar when unchanged)
+        self._var_text: Dict[str, str] = {}
+        self._more_state: Optional[str] = None
+
+        # pending UI refresh (bitmask of _DIRTY_*), flushed once per idle
+        self._dirty = 0
+        self._refresh_job = None
 
         # overlay dialog handle
         self._overlay: Optional[tk.Frame] = None
@@ -138,7 +178,9 @@ class KPIWidget(ttk.Frame):
         # donut spans rows to align left nicely
         self.donut.grid(row=0, column=0, rowspan=2, sticky="nsew")
 
-        self.avg_var = tk.StringVar(value=f"{self._label_prefix} --.- s")
+        self._avg_empty = f"{self._label_prefix} --.- s"
+        self._avg_fmt = f"{self._label_prefix} {{:.3f}} s"
+        self.avg_var = tk.StringVar(value=self._avg_empty)
         self.avg_lbl = ttk.Label(self, textvariable=self.avg_var)
         self.avg_lbl.grid(row=0, column=1, sticky="nsew")
 
@@ -232,6 +274,10 @@ class KPIWidget(ttk.Frame):
 
         Legacy (absolute counters):
             update_kpi(rep_pass=12, rep_total=15, cycle_times=[...])
+
+        Combined (one call per finished cycle):
+            update_kpi(ok=True, cycle_time=1.23, rep_pass=12, rep_total=15, avg_cycle=1.1)
+            -> event is aggregated, then the absolute counters/avg override the headline numbers.
         """
 
         # Thread-safe: if called from worker thread, bounce to main thread
@@ -251,10 +297,8 @@ class KPIWidget(ttk.Frame):
             if avg_cycle is None and cycle_times is not None:
                 avg_cycle = _safe_avg(cycle_times)
             self._avg_cycle = avg_cycle
-            self._update_avg_label()
-            self._update_shift_label()
-            self._update_current_hour_label()
-            self.after_idle(self._redraw)
+            self._update_pass_rate()
+            self._mark_dirty(_DIRTY_ALL)
             return
 
         # event mode
@@ -286,19 +330,16 @@ class KPIWidget(ttk.Frame):
             bucket["n_cycle"] += 1
 
         # aggregate "current clock-hour" (HH:00-HH+1:00)
-        hour_start = _floor_hour(ts)
-        hmap: Dict[datetime, dict] = day["clock_hours"]
-        h = hmap.setdefault(hour_start, {"total": 0, "pass": 0})
-        h["total"] += 1
+        slot = self._hour_slot(ts)
+        day["hour_total"][slot] += 1
         if ev.ok:
-            h["pass"] += 1
+            day["hour_pass"][slot] += 1
 
         # aggregate shift/hour bucket (for dialog)
-        label = self._find_shift_bucket_label(day_key, shift, ts)
-        sb: "OrderedDict[str, dict]" = day["shift_buckets"][shift]
-        sb[label]["total"] += 1
+        idx = self._find_shift_bucket_index(day, shift, ts)
+        day["shift_total"][shift][idx] += 1
         if ev.ok:
-            sb[label]["pass"] += 1
+            day["shift_pass"][shift][idx] += 1
 
         # switch active day if needed
         if day_key != self._active_day:
@@ -306,6 +347,15 @@ class KPIWidget(ttk.Frame):
 
         self._sync_from_active_day()
 
+        # combined call: caller-owned counters win (same as a trailing legacy call)
+        if rep_pass is not None and rep_total is not None:
+            self._rep_pass = int(rep_pass or 0)
+            self._rep_total = int(rep_total or 0)
+            if avg_cycle is None and cycle_times is not None:
+                avg_cycle = _safe_avg(cycle_times)
+            self._avg_cycle = avg_cycle
+            self._update_pass_rate()
+
     def set_theme(
         self,
         *,
@@ -314,31 +364,38 @@ class KPIWidget(ttk.Frame):
         pass_ring: Optional[str] = None,
         text_color: Optional[str] = None,
     ) -> None:
-        if bg is not None:
+        changed = False
+
+        if bg is not None and bg != self._bg:
             self._bg = bg
+            changed = True
             self.donut.configure(bg=bg)
             self._style.configure(self._avg_style, background=bg)
             self._style.configure(self._prod_style, background=bg)
             self._style.configure(self._shift_style, background=bg)
             self._style.configure(self._frame_style, background=bg)
             self._style.configure(self._prodrow_style, background=bg)
-        if base_ring is not None:
+            self.more_lbl.configure(background=bg)
+            self.prod_lbl.configure(background=bg)
+        if base_ring is not None and base_ring != self._base_ring:
             self._base_ring = base_ring
-        if pass_ring is not None:
+            changed = True
+        if pass_ring is not None and pass_ring != self._pass_ring:
             self._pass_ring = pass_ring
-        if text_color is not None:
+            changed = True
+        if text_color is not None and text_color != self._text_color:
             self._text_color = text_color
-            self._style.configure(self._avg_style, foreground=text_color, background=self._bg)
-            self._style.configure(self._prod_style, foreground=text_color, background=self._bg)
-            self._style.configure(self._shift_style, foreground=text_color, background=self._bg)
-
-            # ✅ prod text theo link_color
-            self._style.configure(self._prod_style, foreground=text_color, background=self._bg)
+            changed = True
+            self._style.configure(self._avg_style, foreground=text_color)
+            self._style.configure(self._prod_style, foreground=text_color)
+            self._style.configure(self._shift_style, foreground=text_color)
 
-            self.more_lbl.configure(foreground=text_color, background=self._bg)
-            self.prod_lbl.configure(foreground=text_color, background=self._bg)
+            self.more_lbl.configure(foreground=text_color)
+            self.prod_lbl.configure(foreground=text_color)
 
-        self.after_idle(self._redraw)
+        # nothing visual changed -> no style flush, no donut redraw
+        if changed:
+            self._mark_dirty(_DIRTY_DONUT)
 
     def set_show_shift_summary(self, show: bool) -> None:
         self._show_shift_summary = bool(show)
@@ -444,24 +501,28 @@ class KPIWidget(ttk.Frame):
         if not day:
             return
 
-        sb: "OrderedDict[str, dict]" = day["shift_buckets"][shift]
+        # build all rows first, then insert in one tight loop (no per-row logic between Tk calls)
+        rows: List[tuple] = []
         p_sum = 0
         t_sum = 0
-        for label, st in sb.items():
-            p = int(st["pass"])
-            t = int(st["total"])
-            f = t - p
+        for label, p, t in zip(day["shift_labels"][shift], day["shift_pass"][shift], day["shift_total"][shift]):
             y = (p / t * 100.0) if t > 0 else 100.0
-            tree.insert("", "end", values=(label, p, f, t, f"{y:.1f}%"))
+            rows.append((label, p, t - p, t, f"{y:.1f}%"))
             p_sum += p
             t_sum += t
 
-        f_sum = t_sum - p_sum
         y_sum = (p_sum / t_sum * 100.0) if t_sum > 0 else 100.0
-        tree.insert("", "end", values=("— Tổng", p_sum, f_sum, t_sum, f"{y_sum:.1f}%"))
+        rows.append(("— Tổng", p_sum, t_sum - p_sum, t_sum, f"{y_sum:.1f}%"))
+
+        insert = tree.insert
+        for values in rows:
+            insert("", "end", values=values)
 
     # ===== internal: day structures =====
     def _ensure_day(self, day_key: str) -> None:
+        # hot path: active day is already the most-recent entry -> no reorder needed
+        if day_key == self._active_day and day_key in self._days:
+            return
         if day_key in self._days:
             self._days.move_to_end(day_key)
             return
@@ -480,14 +541,22 @@ class KPIWidget(ttk.Frame):
         labels_day = self._boundaries_to_labels(boundaries_day)
         labels_night = self._boundaries_to_labels(boundaries_night)
 
-        shift_buckets_day: "OrderedDict[str, dict]" = OrderedDict((lb, {"pass": 0, "total": 0}) for lb in labels_day)
-        shift_buckets_night: "OrderedDict[str, dict]" = OrderedDict((lb, {"pass": 0, "total": 0}) for lb in labels_night)
-
         self._days[day_key] = {
             "events": deque(),
-            "clock_hours": {},  # HH:00->HH+1:00 mapping (datetime -> stats)
+            # clock-hour counters, indexed by _hour_slot(ts)
+            "hour_pass": array("i", [0]) * self._HOUR_SLOTS,
+            "hour_total": array("i", [0]) * self._HOUR_SLOTS,
             "bucket_boundaries": {"DAY": boundaries_day, "NIGHT": boundaries_night},
-            "shift_buckets": {"DAY": shift_buckets_day, "NIGHT": shift_buckets_night},
+            # shift/hour buckets (dialog): labels[i] <-> pass[i]/total[i]
+            "shift_labels": {"DAY": labels_day, "NIGHT": labels_night},
+            "shift_pass": {
+                "DAY": array("i", [0]) * len(labels_day),
+                "NIGHT": array("i", [0]) * len(labels_night),
+            },
+            "shift_total": {
+                "DAY": array("i", [0]) * len(labels_day),
+                "NIGHT": array("i", [0]) * len(labels_night),
+            },
             "stats": {
                 "DAY": {"total": 0, "pass": 0, "sum_cycle": 0.0, "n_cycle": 0},
                 "NIGHT": {"total": 0, "pass": 0, "sum_cycle": 0.0, "n_cycle": 0},
@@ -497,18 +566,27 @@ class KPIWidget(ttk.Frame):
         while len(self._days) > self._keep_days:
             self._days.popitem(last=False)
 
+    def _iso(self, d: date) -> str:
+        cached_d, cached_s = self._iso_cache
+        if d == cached_d:
+            return cached_s
+        s = d.isoformat()
+        self._iso_cache = (d, s)
+        return s
+
     def _calc_kpi_day_key(self, ts: datetime) -> str:
-        if ts.time() < self._DAY_START:
-            return (ts.date() - timedelta(days=1)).isoformat()
-        return ts.date().isoformat()
+        if ts.hour * 60 + ts.minute < self._DAY_START_MIN:
+            return self._iso(ts.date() - timedelta(days=1))
+        return self._iso(ts.date())
 
     def _calc_day_and_shift(self, ts: datetime) -> Tuple[str, str]:
-        t = ts.time()
-        if self._DAY_START <= t < self._NIGHT_START:
-            return ts.date().isoformat(), "DAY"
-        if t < self._DAY_START:
-            return (ts.date() - timedelta(days=1)).isoformat(), "NIGHT"
-        return ts.date().isoformat(), "NIGHT"
+        m = ts.hour * 60 + ts.minute
+        if m < self._DAY_START_MIN:
+            return self._iso(ts.date() - timedelta(days=1)), "NIGHT"
+        day_key = self._iso(ts.date())
+        if m < self._NIGHT_START_MIN:
+            return day_key, "DAY"
+        return day_key, "NIGHT"
 
     # ===== internal: hourly buckets (for dialog) =====
     def _build_hour_boundaries(self, start: datetime, end: datetime) -> List[datetime]:
@@ -538,15 +616,18 @@ class KPIWidget(ttk.Frame):
             labels.append(f"{a:%H:%M}–{b:%H:%M}")
         return labels
 
-    def _find_shift_bucket_label(self, day_key: str, shift: str, ts: datetime) -> str:
-        day = self._days[day_key]
+    def _find_shift_bucket_index(self, day: dict, shift: str, ts: datetime) -> int:
         bounds: List[datetime] = day["bucket_boundaries"][shift]
-        # linear scan is fine (<= 14 boundaries). Keep it simple.
-        for i in range(len(bounds) - 1):
-            if bounds[i] <= ts < bounds[i + 1]:
-                return f"{bounds[i]:%H:%M}–{bounds[i+1]:%H:%M}"
-        # edge case: ts == end
-        return f"{bounds[-2]:%H:%M}–{bounds[-1]:%H:%M}"
+        i = bisect_right(bounds, ts) - 1
+        # edge cases: ts == end (or outside the shift) -> clamp to first/last bucket
+        return min(max(i, 0), len(bounds) - 2)
+
+    def _hour_slot(self, ts: datetime) -> int:
+        slot = (ts.hour - self._DAY_START.hour) % 24
+        if slot == 0 and ts.hour * 60 + ts.minute < self._DAY_START_MIN:
+            # 07:00-07:29 belongs to the previous KPI day, keep it apart from its 07:30-07:59
+            return 24
+        return slot
 
     # ===== internal: sync UI =====
     def _sync_from_active_day(self) -> None:
@@ -561,33 +642,71 @@ class KPIWidget(ttk.Frame):
         sum_cycle = stats["DAY"]["sum_cycle"] + stats["NIGHT"]["sum_cycle"]
         n_cycle = stats["DAY"]["n_cycle"] + stats["NIGHT"]["n_cycle"]
         self._avg_cycle = (sum_cycle / n_cycle) if n_cycle > 0 else None
+        self._update_pass_rate()
+        self._mark_dirty(_DIRTY_ALL)
+
+    def _mark_dirty(self, bits: int) -> None:
+        # coalesce: a burst of events -> one _refresh_ui on the next idle
+        self._dirty |= bits
+        if self._refresh_job is None:
+            self._refresh_job = self.after_idle(self._refresh_ui)
+
+    def _refresh_ui(self) -> None:
+        self._refresh_job = None
+        dirty, self._dirty = self._dirty, 0
+        try:
+            if not self.winfo_exists():
+                return
+        except Exception:
+            return
 
-        self._update_avg_label()
-        self._update_shift_label()
-        self._update_current_hour_label()
-        self.after_idle(self._redraw)
+        if dirty & _DIRTY_AVG:
+            self._update_avg_label()
+        if dirty & _DIRTY_SHIFT:
+            self._update_shift_label()
+        if dirty & _DIRTY_HOUR:
+            self._update_current_hour_label()
+        if dirty & _DIRTY_DONUT:
+            self._redraw()
+
+    def _update_pass_rate(self) -> None:
+        total = self._rep_total
+        if total > 0:
+            rate = min(max(self._rep_pass / total, 0.0), 1.0)
+            self._pass_rate = rate
+            self._pass_pct = int(round(rate * 100))
+        else:
+            self._pass_rate = 0.0
+            self._pass_pct = None
+
+    def _set_var(self, var: tk.StringVar, text: str) -> None:
+        # StringVar.set() is a Tcl round-trip -> only push when the text really changed
+        key = str(var)
+        if self._var_text.get(key) == text:
+            return
+        self._var_text[key] = text
+        var.set(text)
 
     def _update_avg_label(self) -> None:
-        self.avg_var.set(
-            f"{self._label_prefix} {self._avg_cycle:.3f} s" if self._avg_cycle is not None else f"{self._label_prefix} --.- s"
-        )
+        avg = self._avg_cycle
+        self._set_var(self.avg_var, self._avg_fmt.format(avg) if avg is not None else self._avg_empty)
 
     def _update_shift_label(self) -> None:
         if not self._show_shift_summary:
-            self.shift_var.set("")
+            self._set_var(self.shift_var, "")
             return
 
         s_day = self._days[self._active_day]["stats"]["DAY"]
         s_night = self._days[self._active_day]["stats"]["NIGHT"]
 
-        def _rate(p: int, t: int) -> float:
-            return (p / t * 100.0) if t > 0 else 100.0
+        dp, dt = s_day["pass"], s_day["total"]
+        np_, nt = s_night["pass"], s_night["total"]
 
-        self.shift_var.set(
-            f"{self._active_day} | "
-            f"DAY {s_day['pass']}/{s_day['total']} ({_rate(s_day['pass'], s_day['total']):.1f}%)  | "
-            f"NIGHT {s_night['pass']}/{s_night['total']} ({_rate(s_night['pass'], s_night['total']):.1f}%)"
-        )
+        self._set_var(self.shift_var, self._SHIFT_FMT.format(
+            day=self._active_day,
+            dp=dp, dt=dt, dy=(dp / dt * 100.0) if dt > 0 else 100.0,
+            np=np_, nt=nt, ny=(np_ / nt * 100.0) if nt > 0 else 100.0,
+        ))
 
     def _update_current_hour_label(self) -> None:
         if not self._show_hourly_line:
@@ -597,8 +716,8 @@ class KPIWidget(ttk.Frame):
         # detect KPI day rollover even without events
         day_now = self._calc_kpi_day_key(now)
         if day_now != self._active_day:
+            self._ensure_day(day_now)
             self._active_day = day_now
-            self._ensure_day(self._active_day)
             self._sync_from_active_day()
             return
 
@@ -607,24 +726,19 @@ class KPIWidget(ttk.Frame):
 
         day = self._days.get(self._active_day)
         if not day:
-            self.prod_var.set("pass: --")
+            self._set_var(self.prod_var, "pass: --")
             return
 
-        hmap: Dict[datetime, dict] = day["clock_hours"]
-        st = hmap.get(hour_start)
-
-        if st is None:
-            pass_n = 0
-            total_n = 0
-        else:
-            pass_n = int(st.get("pass", 0))
-            total_n = int(st.get("total", 0))
+        pass_n = day["hour_pass"][self._hour_slot(now)]
 
-        self.prod_var.set(f"pass ({hour_start:%H:%M}–{hour_end:%H:%M}): {pass_n}")
+        self._set_var(self.prod_var, self._HOUR_FMT.format(a=hour_start, b=hour_end, n=pass_n))
 
         # disable link if no event data at all (legacy-only)
         has_any_event = (day["stats"]["DAY"]["total"] + day["stats"]["NIGHT"]["total"]) > 0
-        self.more_lbl.configure(state="normal" if has_any_event else "disabled")
+        state = "normal" if has_any_event else "disabled"
+        if state != self._more_state:
+            self._more_state = state
+            self.more_lbl.configure(state=state)
 
     # ===== internal: periodic tick =====
     def _start_tick(self) -> None:
@@ -641,7 +755,7 @@ class KPIWidget(ttk.Frame):
                 return
         except Exception:
             return
-        self._update_current_hour_label()
+        self._mark_dirty(_DIRTY_HOUR)
         self._start_tick()
 
     # ===== donut draw =====
@@ -661,9 +775,14 @@ class KPIWidget(ttk.Frame):
 
         W = H = size
         total = self._rep_total
-        pass_rate = (self._rep_pass / total) if total > 0 else 0.0
-        pass_rate = min(max(pass_rate, 0.0), 1.0)
-        pass_pct = int(round(pass_rate * 100)) if total > 0 else None
+        pass_rate = self._pass_rate
+        pass_pct = self._pass_pct
+
+        # same size + same numbers + same theme -> canvas already shows this exact donut
+        key = (size, pass_rate, pass_pct, self._bg, self._base_ring, self._pass_ring, self._text_color)
+        if key == self._donut_key:
+            return
+        self._donut_key = key
 
         self.donut.delete("all")
 
@@ -1,19 +1,21 @@
 from __future__ import annotations
 
 import os
+import re
 import sys
 import time
 import random
 import logging
 import threading
-import queue
 import tkinter as tk
 from tkinter import ttk
 import tkinter.font as tkfont
 from tkinter.scrolledtext import ScrolledText
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Type, Any
 from collections import deque
+from array import array
 
 # -----------------------------------------------------------------------------
 # Path bootstrap: make sure we can import `src.*` when running this file directly.
@@ -29,13 +31,6 @@ _project_root = _src_dir.parent
 if str(_project_root) not in sys.path:
     sys.path.insert(0, str(_project_root))
 
-# Import shared config/export from src to keep config definitions in sync
-# (CFG/DEFAULTS/ensure_config_file/... if your src/__init__.py exposes them)
-try:
-    from src import *  # type: ignore  # noqa: F401,F403
-except Exception:
-    pass
-
 try:
     from src.utils.resource_path import app_dir  # type: ignore
 except Exception:
@@ -51,58 +46,95 @@ except Exception:
     _HAS_SERIAL = False
 
 
+# comports() walks SetupAPI/sysfs -> keep the filtered+sorted result for a short while
+_PORTS_TTL_SEC = 1.5
+_ports_cache = {"t": 0.0, "v": []}
+
+
 def _is_valid_port_name(p: str) -> bool:
     if not p:
         return False
     s = p.strip()
-    # Windows: COM1, COM2...
-    if re.match(r"^COM\d+$", s, flags=re.IGNORECASE):
-        return True
+    # Windows: COM1, COM2... (plain prefix + digit check, no regex engine)
+    if s[:3].upper() == "COM":
+        tail = s[3:]
+        return tail.isascii() and tail.isdigit()
     # Linux: /dev/ttyUSB0 or ttyUSB0
-    if s.startswith("/dev"):
-        return True
-    return False
+    return s.startswith("/dev") or s.startswith("ttyUSB")
+
+def _port_sort_key(x: str):
+    # COMx by number first, then everything else by name
+    if x[:3].upper() == "COM" and x[3:].isascii() and x[3:].isdigit():
+        return (0, int(x[3:]))
+    return (1, x.upper())
 
-def list_ports() -> list[str]:
+def list_ports(force: bool = False) -> list[str]:
     """
     Return only ports we actually want to show: COMx or ttyUSBx.
     If pyserial exists but returns weird/empty -> return [] (GUI will fallback).
+    Result is cached for _PORTS_TTL_SEC; force=True re-enumerates (Scan Ports).
     """
     if not _HAS_SERIAL:
         return []
+    now = time.monotonic()
+    if not force and (now - _ports_cache["t"]) < _PORTS_TTL_SEC:
+        return list(_ports_cache["v"])
     try:
-        raw = [p.device for p in serial.tools.list_ports.comports()]
-        out = [x for x in raw if _is_valid_port_name(str(x))]
+        raw = [str(p.device) for p in serial.tools.list_ports.comports()]
+        out = [x for x in raw if _is_valid_port_name(x)]
         # optional: stable ordering
-        def key(x: str):
-            xs = x.upper()
-            if xs.startswith("COM"):
-                try:
-                    return (0, int(re.findall(r"\d+", xs)[0]))
-                except Exception:
-                    return (0, 9999)
-            return (1, xs)
-        out.sort(key=key)
-        return out
+        out.sort(key=_port_sort_key)
     except Exception:
-        return []
-    
+        out = []
+    _ports_cache["t"] = now
+    _ports_cache["v"] = out
+    return list(out)
+
+def cached_ports() -> list[str]:
+    """Last list_ports() result without touching the OS (enumerates once if never filled)."""
+    if _ports_cache["t"] <= 0.0:
+        return list_ports()
+    return list(_ports_cache["v"])
+
 try:
     from src.utils.buffer_logger import build_log_buffer
 except Exception:
-    # Fallback: dummy logger builder
-    import logging
-    from typing import List, Tuple
+    # Fallback: minimal logger builder (bounded deque, oldest lines drop automatically)
+    from typing import Deque, Tuple
+
+    class _DequeLogHandler(logging.Handler):
+        def __init__(self, buffer: Deque[str]):
+            super().__init__()
+            self._buffer = buffer
+            self.seq = 0
+
+        def emit(self, record: logging.LogRecord):
+            try:
+                self._buffer.append(self.format(record))
+                self.seq += 1
+            except Exception:
+                self.handleError(record)
 
     def build_log_buffer(
         name: str = "LASERLINK",
         level=logging.DEBUG,
         *,
         max_buffer: int = 500,
-    ) -> Tuple[logging.Logger, List[str]]:
+    ) -> Tuple[logging.Logger, Deque[str]]:
         logger = logging.getLogger(name=name)
+        if getattr(logger, "_laserlink_inited", False):
+            return logger, getattr(logger, "_laserlink_buffer")
+
         logger.setLevel(level)
-        return logger, []
+        buf: Deque[str] = deque(maxlen=max_buffer or None)
+        handler = _DequeLogHandler(buf)
+        handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)-8s | %(name)s | %(message)s", "%Y-%m-%d %H:%M:%S"))
+        logger.addHandler(handler)
+
+        logger._laserlink_inited = True
+        logger._laserlink_buffer = buf
+        logger._laserlink_handler = handler
+        return logger, buf
     
 # -----------------------------
 # Theme constants (Light, "uy tín")
@@ -117,11 +149,142 @@ OK_FG = "#0F5132"
 ERR_FG = "#842029"
 WARN_FG = "#7A4B00"
 
+class _StatusThemes(dict):
+    """code -> (bg, big_fg, sub_fg); unknown codes fall back to IDLE without a .get() default."""
+
+    def __missing__(self, key):
+        return self["IDLE"]
+
+
+# Xanh / Đỏ / Lục / Vàng / Trắng (high-contrast cho công nhân)
+_STATUS_THEMES = _StatusThemes({sys.intern(k): v for k, v in {
+    # trắng
+    "IDLE":       ("#FFFFFF", TEXT, MUTED),
+    "READY":      ("#FFFFFF", TEXT, MUTED),
+    "STOPPED":    ("#FFFFFF", TEXT, MUTED),
+
+    # xanh (blue) cho “đang chạy/đang test”
+    "LISTENING":  ("#0EA5E9", "#FFFFFF", "#E5E7EB"),
+    "TESTING":    ("#124BC7", "#FFFFFF", "#E5E7EB"),
+    "STANDBY":    ("#0EA5E9", "#FFFFFF", "#E5E7EB"),
+
+    # lục (green) cho OK/PASS
+    "OK":         ("#22C55E", "#FFFFFF", "#ECFDF5"),
+    "PASS":       ("#22C55E", "#FFFFFF", "#ECFDF5"),
+
+    # vàng (yellow) cho WARN
+    "WARN":       ("#F59E0B", "#111827", "#111827"),
+    "WARNING":    ("#F59E0B", "#111827", "#111827"),
+
+    # đỏ (red) cho FAIL/ERROR
+    "FAIL":       ("#EF4444", "#FFFFFF", "#FEE2E2"),
+    "ERROR":      ("#DC2626", "#FFFFFF", "#FEE2E2"),
+}.items()})
+
+# theme tuple -> style-name prefix (first code that uses it); codes sharing colors share styles
+_STATUS_STYLE_PREFIX: dict[tuple[str, str, str], str] = {}
+for _code, _theme in _STATUS_THEMES.items():
+    _STATUS_STYLE_PREFIX.setdefault(_theme, _code)
+del _code, _theme
+
+# Static ttk styles (configured in one loop at window construction)
+_STYLE_TABLE: tuple[tuple[str, dict], ...] = (
+    ("TFrame",             {"background": BG}),
+    ("Card.TFrame",        {"background": CARD_BG, "borderwidth": 0, "relief": "flat"}),
+    ("InCard.TFrame",      {"background": CARD_BG, "borderwidth": 0, "relief": "flat"}),
+    ("Thin.TSeparator",    {"background": BORDER}),
+    ("TLabel",             {"background": CARD_BG, "foreground": TEXT}),
+    ("Muted.TLabel",       {"background": CARD_BG, "foreground": MUTED}),
+    ("DialogTitle.TLabel", {"background": CARD_BG, "foreground": TEXT}),
+    ("Error.TLabel",       {"background": CARD_BG, "foreground": ERR_FG}),
+    # ---- Status styles (for background coloring) ----
+    ("StatusCard.TFrame",  {"background": CARD_BG, "borderwidth": 0, "relief": "flat"}),
+    ("StatusTitle.TLabel", {"background": CARD_BG, "foreground": MUTED}),
+    ("StatusBig.TLabel",   {"background": CARD_BG, "foreground": TEXT}),
+    ("StatusDesc.TLabel",  {"background": CARD_BG, "foreground": MUTED}),
+    # ---- Style flat button
+    ("Flat.TButton",       {"relief": "flat", "borderwidth": 0, "focusthickness": 0, "padding": (12, 8)}),
+)
+
+class _CycleRing:
+    """Fixed-size ring of recent cycle times (flat float64 array) with a running window sum."""
+
+    __slots__ = ("_buf", "_cap", "_idx", "_n", "_sum")
+
+    def __init__(self, cap: int = 200):
+        self._cap = int(cap)
+        self._buf = array("d", [0.0]) * self._cap
+        self._idx = 0
+        self._n = 0
+        self._sum = 0.0
+
+    def append(self, t: float) -> None:
+        i = self._idx
+        if self._n == self._cap:
+            self._sum -= self._buf[i]
+        else:
+            self._n += 1
+        self._buf[i] = t
+        self._sum += t
+        i += 1
+        if i == self._cap:
+            i = 0
+            # re-sum once per wrap so float drift from add/sub can't accumulate
+            self._sum = sum(self._buf)
+        self._idx = i
+
+    def mean(self) -> float:
+        return (self._sum / self._n) if self._n else 0.0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __iter__(self):
+        # oldest -> newest
+        if self._n < self._cap:
+            return iter(self._buf[:self._n])
+        return iter(self._buf[self._idx:] + self._buf[:self._idx])
+
+
+# Named Tk fonts, one per (family, size, weight) *per Tk interpreter*: a Font belongs to the
+# interpreter that created it, so the cache lives on that root (a second Tk() gets its own).
+def _root_font_cache(root: tk.Misc | None) -> dict:
+    root = root if root is not None else tk._default_root
+    cache = getattr(root, "_laserlink_font_cache", None)
+    if cache is None:
+        cache = {}
+        root._laserlink_font_cache = cache
+    return cache
+
+
+def get_font(family: str, size: int, weight: str = "normal", *, root: tk.Misc | None = None) -> tkfont.Font:
+    root = root._root() if root is not None else tk._default_root
+    cache = _root_font_cache(root)
+    key = (family, int(size), weight)
+    f = cache.get(key)
+    if f is None:
+        f = tkfont.Font(root=root, family=family, size=int(size), weight=weight)
+        cache[key] = f
+    return f
+
+
+def base_font_info(widget: tk.Misc) -> tuple[str, int]:
+    """(family, size) of TkDefaultFont, resolved once per interpreter with a single actual()."""
+    root = widget._root()
+    cache = _root_font_cache(root)
+    info = cache.get("<base>")
+    if info is None:
+        actual = tkfont.nametofont("TkDefaultFont").actual()
+        info = (actual["family"], int(actual["size"]))
+        cache["<base>"] = info
+    return info
+
 EDIT_KEY_ENV = "LASERLINK_EDIT_KEY"
 DEFAULT_EDIT_KEY = "Laserlinkfii168!!"          # đổi tuỳ bạn
 
 EDIT_UNLOCK_TTL_SEC = 3       # unlock tạm 3 giây sau khi nhập đúng
 SHOW_SCAN_UI = False
+SHOW_MODEL_UI = False   # model row hidden: its widgets are not built at all
 
 # ----- Your stimulation pool (PASS/FAIL variants) -----
 STIMULATION = True
@@ -152,7 +315,6 @@ RESP_POOL = {
 # All COM/BAUDRATE/RULES should be read & written via the singleton CFG in src.core.
 try:
     from src.core import CFG, send_text_and_wait, send_text_and_polling, send_text_only, send_text_and_wait_norml
-    from src.core.core_serial import SFCComReader
     from src.gui.gui_KIP import KPIWidget
 except Exception as e:
     print("DEBUGS::")
@@ -163,15 +325,29 @@ except Exception as e:
 # Check Mo,NEEDPSN
 _RX_MONEYSN_LINE = re.compile(
     r"^\s*([A-Z0-9][A-Z0-9_-]{1,31})\s*,\s*(NEEDPSN\d{1,4})\s*$",
-    re.IGNORECASE,
+    re.ASCII | re.IGNORECASE,  # scanner data is ASCII -> skip Unicode case folding
 )
 _RX_NEEDPSN = re.compile(r"NEEDPSN\d+", re.IGNORECASE)
+_RX_MODEL_ID = re.compile(r"[A-Za-z0-9_.-]+")
+# status tokens (case-insensitive, no upper() copy). FAIL wins over PASS wherever it appears,
+# so the two groups are searched separately instead of trusting the first alternation hit.
+_RX_STATUS_FAIL = re.compile(r"PASSED=0|FAIL|ERRO", re.IGNORECASE)
+_RX_STATUS_PASS = re.compile(r"PASSED=1| PASS|PASS\Z", re.IGNORECASE)
 _MONEYSN_MIN_LEN = 8
 _MONEYSN_MAX_LEN = 64
+# drop CR/LF from scanner input in one pass (instead of chained replace())
+_SCAN_STRIP_CRLF = str.maketrans("", "", "\r\n")
+# drop all ASCII whitespace from typed/scanned MO / H codes (replaces re.sub(r"\s+", "", ...))
+_WS_TRANSLATE = dict.fromkeys(map(ord, " \t\r\n\v\f"), None)
 
 
+# pure str -> tuple functions; the scanner keeps sending the same MO lines -> memoize
+@lru_cache(maxsize=1024)
 def parse_moneysn_line(text: str, expected_mo: str) -> tuple[str, str] | None:
-    s = (text or "").replace("\r", "").replace("\n", "").strip()
+    # fast reject before any normalization: too short / no NEEDPSNxx token at all
+    if not text or len(text) < _MONEYSN_MIN_LEN or not _RX_NEEDPSN.search(text):
+        return None
+    s = text.translate(_SCAN_STRIP_CRLF).strip()
     if not s:
         return None
     if len(s) < _MONEYSN_MIN_LEN or len(s) > _MONEYSN_MAX_LEN:
@@ -207,8 +383,11 @@ class DialogHost(ttk.Frame):
         super().__init__(parent)
         self.place_forget()
 
-        self.stack: list[ttk.Frame] = []
-        self._focus_stack: list[Optional[tk.Widget]] = []
+        self.stack: deque[ttk.Frame] = deque()
+        self._focus_stack: deque[Optional[tk.Widget]] = deque()
+        # cached: toplevel never changes; "shown" mirrors place/place_forget (no winfo_ismapped round-trip)
+        self._toplevel = self.winfo_toplevel()
+        self._shown = False
 
         # Dim background (inside same window)
         self.dim = tk.Canvas(self, highlightthickness=0, bd=0, bg=BG)
@@ -231,42 +410,51 @@ class DialogHost(ttk.Frame):
         except tk.TclError:
             pass
 
+    def _present(self, dlg: ttk.Frame) -> None:
+        # place + raise + focus straight through tk.call: no kwargs->option walk, no script parsing
+        w = dlg._w
+        call = self.tk.call
+        try:
+            call("place", w, "-x", 0, "-y", 0, "-relwidth", 1, "-relheight", 1)
+            call("raise", w)
+            call("focus", w)
+        except tk.TclError:
+            pass
+
     def show(self, dialog: ttk.Frame) -> None:
         # Make overlay visible and modal
-        if not self.winfo_ismapped():
-            self.place(x=0, y=0, relwidth=1, relheight=1)
-            self.lift()
+        if not self._shown:
+            self._shown = True
             try:
+                self.tk.call("place", self._w, "-x", 0, "-y", 0, "-relwidth", 1, "-relheight", 1)
+                self.tk.call("raise", self._w)
                 self.grab_set()  # modal
             except tk.TclError:
                 pass
 
         # Save focus to restore later
+        # (focus_get raises KeyError when focus sits in a Tk-internal widget, e.g. combobox popdown)
         try:
-            self._focus_stack.append(self.winfo_toplevel().focus_get())
-        except Exception:
+            self._focus_stack.append(self._toplevel.focus_get())
+        except (tk.TclError, KeyError):
             self._focus_stack.append(None)
 
-        # Hide previous top (keep in stack)
-        if self.stack:
-            self.stack[-1].place_forget()
-
-        self.stack.append(dialog)
-
-        # Keep dim behind dialogs (but above the main UI because host is lifted)
-        # Use tk-level 'lower' so we lower the canvas widget itself (Canvas.lower is for canvas items)
         try:
-            self.tk.call("lower", self.dim._w)
+            # Hide previous top (keep in stack)
+            if self.stack:
+                self.stack[-1].place_forget()
+            else:
+                # Keep dim behind dialogs (but above the main UI because host is lifted)
+                # Use tk-level 'lower' so we lower the canvas widget itself (Canvas.lower is for canvas items)
+                # Only needed for the first dialog: later ones are stacked above it already.
+                self.tk.call("lower", self.dim._w)
         except tk.TclError:
             pass
-        dialog.place(x=0, y=0, relwidth=1, relheight=1)
-        dialog.lift()
+
+        self.stack.append(dialog)
 
         # Give focus to dialog (if possible)
-        try:
-            dialog.focus_set()
-        except Exception:
-            pass
+        self._present(dialog)
 
     def close_top(self) -> None:
         if not self.stack:
@@ -275,32 +463,28 @@ class DialogHost(ttk.Frame):
         top = self.stack.pop()
         try:
             top.destroy()
-        except Exception:
+        except tk.TclError:
             pass
 
         # Restore previous or hide overlay
         if self.stack:
-            dlg = self.stack[-1]
             # restore as expanded centered dialog
-            dlg.place(x=0, y=0, relwidth=1, relheight=1)
-            dlg.lift()
-            try:
-                dlg.focus_set()
-            except Exception:
-                pass
+            self._present(self.stack[-1])
         else:
-            self.place_forget()
+            self._shown = False
             try:
+                self.place_forget()
                 self.grab_release()
             except tk.TclError:
                 pass
 
         # Restore previous focus if available
         prev = self._focus_stack.pop() if self._focus_stack else None
-        if prev and prev.winfo_exists():
+        if prev is not None:
             try:
-                prev.focus_set()
-            except Exception:
+                if prev.winfo_exists():
+                    prev.focus_set()
+            except tk.TclError:
                 pass
 
     def close_all(self) -> None:
@@ -359,7 +543,8 @@ class InfoDialog(BaseDialog):
 
     def __init__(self, host: DialogHost, info_text: str):
         super().__init__(host, "INFO")
-        txt = ScrolledText(self.body, height=14, wrap="word")
+        # read-only text: no undo stack; fill while still unmapped (single layout pass on pack)
+        txt = ScrolledText(self.body, height=14, wrap="word", undo=False, autoseparators=False)
         txt.insert("1.0", info_text)
         txt.configure(state="disabled")
         txt.pack(fill="both", expand=True)
@@ -480,27 +665,37 @@ class ModelEditDialog(ttk.Frame):
 
     def _reload_list(self) -> None:
         self.lb.delete(0, "end")
+        # Python-side mirror of the listbox rows (no lb.get() Tcl calls) + pre-lowered keys
+        self._models: list[str] = []
+        self._models_lower: list[str] = []
+        # model.lower() -> listbox row (first occurrence wins, like the old linear scan)
+        self._model_index: dict[str, int] = {}
         if self.app.cfg is None:
             return
-        for m in (self.app.cfg.get_models() or []):
-            self.lb.insert("end", m)
+        self._models = [str(m) for m in (self.app.cfg.get_models() or [])]
+        self._models_lower = [m.lower() for m in self._models]
+        if self._models:
+            # one Tcl "insert end a b c ..." instead of one call per model
+            self.lb.insert("end", *self._models)
+        for i, ml in enumerate(self._models_lower):
+            self._model_index.setdefault(ml, i)
 
     def _select_in_list(self, model: str) -> None:
         target = (model or "").strip().lower()
         if not target:
             return
-        for i in range(self.lb.size()):
-            if str(self.lb.get(i)).lower() == target:
-                self.lb.selection_clear(0, "end")
-                self.lb.selection_set(i)
-                self.lb.see(i)
-                return
+        i = self._model_index.get(target)
+        if i is None:
+            return
+        self.lb.selection_clear(0, "end")
+        self.lb.selection_set(i)
+        self.lb.see(i)
 
     def _load_selected_from_list(self) -> None:
         sel = self.lb.curselection()
         if not sel:
             return
-        model = str(self.lb.get(sel[0]))
+        model = self._models[sel[0]]
         self._load_model(model)
 
     def _load_model(self, model: str) -> None:
@@ -523,7 +718,7 @@ class ModelEditDialog(ttk.Frame):
         sel = self.lb.curselection()
         if not sel:
             return
-        model = str(self.lb.get(sel[0]))
+        model = self._models[sel[0]]
         ok = bool(self.app.cfg.set_current_selected_model(model, persist=True))
         if ok:
             self.app._refresh_model_picker(select=model)
@@ -540,14 +735,13 @@ class ModelEditDialog(ttk.Frame):
         model_id = (self.v_model_id.get() or "").strip()
         needpsn  = (self.v_needpsn.get() or "").strip()
 
-        import re
         if not model_id:
             self.lbl_err.configure(text="MODEL ID không được trống.")
             return
-        if not re.fullmatch(r"[A-Za-z0-9_.-]+", model_id):
+        if not _RX_MODEL_ID.fullmatch(model_id):
             self.lbl_err.configure(text="MODEL ID chỉ nên gồm: A-Z a-z 0-9 _ . -")
             return
-        if not re.fullmatch(r"NEEDPSN\d+", needpsn, flags=re.IGNORECASE):
+        if not _RX_NEEDPSN.fullmatch(needpsn):
             self.lbl_err.configure(text="NEEDPSN không hợp lệ. Ví dụ đúng: NEEDPSN04")
             return
 
@@ -648,7 +842,9 @@ class EditConfigDialog(BaseDialog):
         self.v_baud_scan  = tk.StringVar(value=str(snap.get("BAUDRATE_SCAN", "9600")))
 
         # ports = [""] + list_ports()
-        valid_ports = list_ports()  # đã lọc COM/ttyUSB
+        # cached snapshot first (no blocking enumeration on open), refreshed in background below
+        valid_ports = cached_ports()  # đã lọc COM/ttyUSB
+        valid_set = frozenset(valid_ports)
         has_valid_ports = bool(valid_ports)
 
         # Nếu không có port hợp lệ => reset tất cả box COM để tránh hiển thị giá trị sai/stale
@@ -658,11 +854,11 @@ class EditConfigDialog(BaseDialog):
             self.v_com_scan.set(snap.get("COM_SCAN", ""))
         else:
             # Có ports hợp lệ -> nếu config đang set port không nằm trong list -> reset field đó
-            if (self.v_com_laser.get() or "").strip() not in valid_ports:
+            if (self.v_com_laser.get() or "").strip() not in valid_set:
                 self.v_com_laser.set(snap.get("COM_LASER", ""))
-            if (self.v_com_sfc.get() or "").strip() not in valid_ports:
+            if (self.v_com_sfc.get() or "").strip() not in valid_set:
                 self.v_com_sfc.set(snap.get("COM_SFC", ""))
-            if (self.v_com_scan.get() or "").strip() not in valid_ports:
+            if (self.v_com_scan.get() or "").strip() not in valid_set:
                 self.v_com_scan.set(snap.get("COM_SCAN", ""))
         
 
@@ -671,11 +867,15 @@ class EditConfigDialog(BaseDialog):
         for c in range(2):
             grid.columnconfigure(c, weight=1)
 
-        def row(r: int, label: str, var: tk.StringVar, choices: Optional[list[str]] = None):
+        self._port_cbs: list[ttk.Combobox] = []
+
+        def row(r: int, label: str, var: tk.StringVar, choices: Optional[list[str]] = None, is_port: bool = False):
             ttk.Label(grid, text=label, style="Muted.TLabel").grid(row=r, column=0, sticky="w", pady=6, padx=(0, 10))
             if choices is not None:
                 cb = ttk.Combobox(grid, textvariable=var, values=choices, state="normal")
                 cb.grid(row=r, column=1, sticky="ew", pady=6)
+                if is_port:
+                    self._port_cbs.append(cb)
             else:
                 ent = ttk.Entry(grid, textvariable=var)
                 ent.grid(row=r, column=1, sticky="ew", pady=6)
@@ -685,10 +885,10 @@ class EditConfigDialog(BaseDialog):
         # port_choices = ports if ports and _HAS_SERIAL else None
         port_choices = ([""] + valid_ports) if has_valid_ports else None
         row_num = 0
-        row(row_num := row_num + 1, "COM_LASER", self.v_com_laser, port_choices)
-        row(row_num := row_num + 1, "COM_SFC", self.v_com_sfc, port_choices)
+        row(row_num := row_num + 1, "COM_LASER", self.v_com_laser, port_choices, True)
+        row(row_num := row_num + 1, "COM_SFC", self.v_com_sfc, port_choices, True)
         if SHOW_SCAN_UI:
-            row(row_num := row_num + 1, "COM_SCAN", self.v_com_scan, port_choices)
+            row(row_num := row_num + 1, "COM_SCAN", self.v_com_scan, port_choices, True)
 
         ttk.Separator(grid, style="Thin.TSeparator").grid(row=(row_num := row_num + 1), column=0, columnspan=2, sticky="ew", pady=10)
 
@@ -719,8 +919,48 @@ class EditConfigDialog(BaseDialog):
         ttk.Button(right, text="Cancel", style="Flat.TButton", takefocus=False, command=self.host.close_top, width=10).pack(side="right", padx=(8, 0))
         ttk.Button(right, text="Save", style="Flat.TButton", takefocus=False, command=self._save, width=10).pack(side="right")
 
+        if self._port_cbs and _HAS_SERIAL:
+            threading.Thread(target=self._refresh_ports_worker, daemon=True).start()
+
+    # comports() can block for a few hundred ms (SetupAPI) -> enumerate off the Tk thread
+    def _refresh_ports_worker(self):
+        ports = list_ports(force=True)
+        try:
+            self.after(0, lambda: self._apply_ports(ports))
+        except Exception:
+            pass
+
+    def _apply_ports(self, ports: list[str]):
+        if not ports:
+            return
+        try:
+            if not self.winfo_exists():
+                return
+            for cb in self._port_cbs:
+                cb.configure(values=[""] + ports)
+        except tk.TclError:
+            pass
+
     def _scan_ports(self):
-        info = "pyserial chưa có nên không scan được." if not _HAS_SERIAL else "\n".join(list_ports()) or "(No ports found)"
+        if not _HAS_SERIAL:
+            self.host.show(InfoDialog(self.host, "Available ports:\npyserial chưa có nên không scan được."))
+            return
+        threading.Thread(target=self._scan_worker, daemon=True).start()
+
+    def _scan_worker(self):
+        ports = list_ports(force=True)
+        info = "\n".join(ports) or "(No ports found)"
+        try:
+            self.after(0, lambda: self._show_scan_result(info))
+        except Exception:
+            pass
+
+    def _show_scan_result(self, info: str):
+        try:
+            if not self.winfo_exists():
+                return
+        except tk.TclError:
+            return
         self.host.show(InfoDialog(self.host, f"Available ports:\n{info}"))
 
     def _save(self):
@@ -764,17 +1004,18 @@ class EditConfigDialog(BaseDialog):
 # -----------------------------
 # Flow Thread
 # -----------------------------
-_RX_NEEDPSN = re.compile(r"NEEDPSN\d+", re.IGNORECASE)
-
+@lru_cache(maxsize=512)
 def infer_status(text: str) -> str | None:
-    up = (text or "").upper()
+    if not text:
+        return None
     # ưu tiên FAIL trước
-    if "PASSED=0" in up or "FAIL" in up or "ERRO" in up:
+    if _RX_STATUS_FAIL.search(text):
         return "FAIL"
-    if "PASSED=1" in up or " PASS" in up or up.endswith("PASS"):
+    if _RX_STATUS_PASS.search(text):
         return "PASS"
     return None
 
+@lru_cache(maxsize=512)
 def find_needpsn(text: str) -> str | None:
     m = _RX_NEEDPSN.search(text or "")
     return m.group(0).upper() if m else None
@@ -783,6 +1024,20 @@ def find_needpsn(text: str) -> str | None:
 # Main App
 # -----------------------------
 class LASERLINKAPP(tk.Tk):
+    # open-flow listener state (_oflow_state): one int read per loop instead of several Event checks
+    _OFLOW_RUN, _OFLOW_PAUSE, _OFLOW_STOP = 0, 1, 2
+
+    _MOCK_SEQ: tuple[tuple[str, str], ...] = (
+        ("IDLE", "Ready."),
+        ("LISTENING", "Waiting for LASER trigger..."),
+        ("TESTING", "Sending to SFC..."),
+        ("PASS", "SFC: PASSED=1"),
+        ("TESTING", "Next cycle..."),
+        ("FAIL", "SFC: FAIL"),
+        ("WARN", "Retrying / Port unstable..."),
+        ("ERROR", "Timeout / No response..."),
+    )
+
     def __init__(self):
         super().__init__()
         self.title("LASERLINK")
@@ -818,23 +1073,18 @@ class LASERLINKAPP(tk.Tk):
         except Exception:
             pass
 
-        style.configure("TFrame", background=BG)
-        style.configure("Card.TFrame", background=CARD_BG, borderwidth=0, relief="flat")
-        style.configure("InCard.TFrame", background=CARD_BG, borderwidth=0, relief="flat")
-        style.configure("Thin.TSeparator", background=BORDER)
-        style.configure("TLabel", background=CARD_BG, foreground=TEXT)
-        style.configure("Muted.TLabel", background=CARD_BG, foreground=MUTED)
-        style.configure("DialogTitle.TLabel", background=CARD_BG, foreground=TEXT, font=("TkDefaultFont", 12, "bold"))
-        style.configure("Error.TLabel", background=CARD_BG, foreground=ERR_FG)
-
-        # ---- Status styles (for background coloring) ----
-        style.configure("StatusCard.TFrame", background=CARD_BG, borderwidth=0, relief="flat")
-        style.configure("StatusTitle.TLabel", background=CARD_BG, foreground=MUTED)
-        style.configure("StatusBig.TLabel",   background=CARD_BG, foreground=TEXT)
-        style.configure("StatusDesc.TLabel",  background=CARD_BG, foreground=MUTED)
-
-        # ---- Style flat button
-        style.configure("Flat.TButton", relief="flat", borderwidth=0, focusthickness=0, padding=(12, 8))
+        for name, opts in _STYLE_TABLE:
+            style.configure(name, **opts)
+        # per-theme status styles ("PASS.StatusBig.TLabel" ...), registered once;
+        # set_status then only swaps style names on the 4 status widgets
+        for theme, prefix in _STATUS_STYLE_PREFIX.items():
+            bg, big_fg, sub_fg = theme
+            style.configure(f"{prefix}.StatusCard.TFrame", background=bg)
+            style.configure(f"{prefix}.StatusTitle.TLabel", background=bg, foreground=sub_fg)
+            style.configure(f"{prefix}.StatusBig.TLabel", background=bg, foreground=big_fg)
+            style.configure(f"{prefix}.StatusDesc.TLabel", background=bg, foreground=sub_fg)
+        style.configure("DialogTitle.TLabel", font=get_font("TkDefaultFont", 12, "bold"))
+
         style.map("Flat.TButton", focuscolor=[("focus", "")])
         style.map("Flat.TButton",
             relief=[("pressed", "flat"), ("active", "flat")],
@@ -844,30 +1094,7 @@ class LASERLINKAPP(tk.Tk):
 
         self._style = style  # giữ lại để update runtime
 
-        # Xanh / Đỏ / Lục / Vàng / Trắng (high-contrast cho công nhân)
-        self.STATUS_THEMES = {
-            # trắng
-            "IDLE":       ("#FFFFFF", TEXT, MUTED),
-            "READY":      ("#FFFFFF", TEXT, MUTED),
-            "STOPPED":    ("#FFFFFF", TEXT, MUTED),
-
-            # xanh (blue) cho “đang chạy/đang test”
-            "LISTENING":  ("#0EA5E9", "#FFFFFF", "#E5E7EB"),
-            "TESTING":    ("#124BC7", "#FFFFFF", "#E5E7EB"),
-            "STANDBY":    ("#0EA5E9", "#FFFFFF", "#E5E7EB"),
-
-            # lục (green) cho OK/PASS
-            "OK":         ("#22C55E", "#FFFFFF", "#ECFDF5"),
-            "PASS":       ("#22C55E", "#FFFFFF", "#ECFDF5"),
-
-            # vàng (yellow) cho WARN
-            "WARN":       ("#F59E0B", "#111827", "#111827"),
-            "WARNING":    ("#F59E0B", "#111827", "#111827"),
-
-            # đỏ (red) cho FAIL/ERROR
-            "FAIL":       ("#EF4444", "#FFFFFF", "#FEE2E2"),
-            "ERROR":      ("#DC2626", "#FFFFFF", "#FEE2E2"),
-        }
+        self.STATUS_THEMES = _STATUS_THEMES
 
         # Main content container
         self.container = ttk.Frame(self, padding=18, style="TFrame")
@@ -890,7 +1117,7 @@ class LASERLINKAPP(tk.Tk):
         self.status_title = ttk.Label(self.status_card, text="STATUS", style="StatusTitle.TLabel")
         self.status_title.grid(row=0, column=0, sticky="w")
 
-        self.status_big = ttk.Label(self.status_card, text="IDLE", style="StatusBig.TLabel", font=("TkDefaultFont", 26, "bold"))
+        self.status_big = ttk.Label(self.status_card, text="IDLE", style="StatusBig.TLabel", font=get_font("TkDefaultFont", 26, "bold"))
         self.status_big.grid(row=1, column=0, sticky="w", pady=(6, 0))
 
         self.status_desc = ttk.Label(self.status_card, text="Ready.", style="StatusDesc.TLabel")
@@ -905,48 +1132,46 @@ class LASERLINKAPP(tk.Tk):
         self.rep_pass  = 0
         self.rep_fail  = 0
 
-        self.cycle_times = deque(maxlen=200)
+        self.cycle_times = _CycleRing(200)
 
-        # ✅ KPI donut bên phải (cùng grid manager)
-        self.kpi = KPIWidget(self.status_card, donut_size=50)
-        self.kpi.grid(row=0, column=1, rowspan=3, sticky="e", padx=(14, 0))
+        # ✅ KPI donut bên phải (cùng grid manager) -> built lazily via the `kpi` property
+        self._kpi: KPIWidget | None = None
+        self._kpi_theme: tuple[str, str] | None = None
 
-        # Ensure status texts stay above any overlays (e.g., KPI canvas)
-        try:
-            self.status_title.lift()
-            self.status_big.lift()
-            self.status_desc.lift()
-        except Exception:
-            pass
+        # last painted status (skip no-op set_status calls)
+        self._last_status_code: str | None = None
+        self._last_status_desc: str | None = None
+        self._last_status_theme: tuple[str, str, str] | None = None
 
         # Model row 
-        # ✅ new model row
-        self.model_card = ttk.Frame(self.container, style="Card.TFrame", padding=14)
-        self.model_card.grid(row=1, column=0, sticky="ew", pady=(14, 0))
-        self.model_card.columnconfigure(1, weight=1)
-
-        ttk.Label(self.model_card, text="MODEL", style="Muted.TLabel").grid(row=0, column=0, sticky="w")
-
+        # ✅ new model row (vars always exist for the programmatic model/NEEDPSN paths)
         self._v_model = tk.StringVar(value="")
-        self.cb_model = ttk.Combobox(self.model_card, textvariable=self._v_model, state="readonly", width=28)
-        self.cb_model.grid(row=0, column=1, sticky="w", padx=(10, 0))
-        self.cb_model.bind("<<ComboboxSelected>>", lambda _e: self._on_model_selected())
-
         self._v_needpsn = tk.StringVar(value="")
-        ttk.Label(self.model_card, textvariable=self._v_needpsn, style="Muted.TLabel")\
-            .grid(row=0, column=2, sticky="w", padx=(12, 0))
-
-        btns = ttk.Frame(self.model_card, style="InCard.TFrame")
-        btns.grid(row=0, column=3, sticky="e")
-        ttk.Button(btns, text="Edit Models", style="Flat.TButton", takefocus=False, command=lambda: self.open_edit("models")).pack(side="left", padx=(0, 8))
-        ttk.Button(btns, text="Refresh", style="Flat.TButton", takefocus=False, command=self._refresh_model_picker).pack(side="left")
-        # Keep the model row in the widget hierarchy for logic, but hide it from the UI
-        # so the model data/combobox remain usable programmatically.
-        try:
-            self.model_card.grid_remove()
-        except Exception:
-            # If grid_remove fails for any reason, ignore to preserve behavior
-            pass
+        self.cb_model: ttk.Combobox | None = None
+        self._cb_values_cache: dict[str, tuple[str, ...]] = {}
+        # kind ("model"/"mo"/"h_code") -> (values, {value.lower(): value}); rebuilt only when values change
+        self._lower_index_cache: dict[str, tuple[tuple[str, ...], dict[str, str]]] = {}
+        # (values, target) of the last picker paint; the 800ms tick re-runs the pickers on every config change
+        self._last_mo_values_sig: tuple | None = None
+        self._last_h_code_values_sig: tuple | None = None
+        if SHOW_MODEL_UI:
+            self.model_card = ttk.Frame(self.container, style="Card.TFrame", padding=14)
+            self.model_card.grid(row=1, column=0, sticky="ew", pady=(14, 0))
+            self.model_card.columnconfigure(1, weight=1)
+
+            ttk.Label(self.model_card, text="MODEL", style="Muted.TLabel").grid(row=0, column=0, sticky="w")
+
+            self.cb_model = ttk.Combobox(self.model_card, textvariable=self._v_model, state="readonly", width=28)
+            self.cb_model.grid(row=0, column=1, sticky="w", padx=(10, 0))
+            self.cb_model.bind("<<ComboboxSelected>>", lambda _e: self._on_model_selected())
+
+            ttk.Label(self.model_card, textvariable=self._v_needpsn, style="Muted.TLabel")\
+                .grid(row=0, column=2, sticky="w", padx=(12, 0))
+
+            btns = ttk.Frame(self.model_card, style="InCard.TFrame")
+            btns.grid(row=0, column=3, sticky="e")
+            ttk.Button(btns, text="Edit Models", style="Flat.TButton", takefocus=False, command=lambda: self.open_edit("models")).pack(side="left", padx=(0, 8))
+            ttk.Button(btns, text="Refresh", style="Flat.TButton", takefocus=False, command=self._refresh_model_picker).pack(side="left")
 
         # MO - Scan
         # -------------------------
@@ -961,15 +1186,14 @@ class LASERLINKAPP(tk.Tk):
         self.mo_scan_card.columnconfigure(0, weight=1)
 
         # fonts
-        base_font  = tkfont.nametofont("TkDefaultFont")
-        family     = base_font.actual("family")
-        base_size  = int(base_font.actual("size"))
+        family, base_size = base_font_info(self)
 
         title_size = max(base_size + 6, 16)
         scan_size  = min(max(base_size + 22, 30), 46)  # 30~46 là hợp lý
 
-        style.configure("ScanTitle.TLabel", font=(family, title_size, "bold"))
-        style.configure("Scan.TEntry",      font=(family, scan_size,  "bold"))
+        scan_font = get_font(family, scan_size, "bold")
+        style.configure("ScanTitle.TLabel", font=get_font(family, title_size, "bold"))
+        style.configure("Scan.TEntry",      font=scan_font)
 
         # ===== Shared layout constants (gọn đẹp) =====
         LBL_W   = 7      # độ rộng label "MO"/"H Code" (text units)
@@ -1034,7 +1258,7 @@ class LASERLINKAPP(tk.Tk):
         self.mo_scan_card,
             textvariable=self._v_moneysn,
             style="Scan.TEntry",
-            font=(family, scan_size, "bold"),   # ✅ force apply
+            font=scan_font,   # ✅ force apply
             justify="center",
         )
         self.ent_moneysn.grid(row=3, column=0, sticky="ew", ipady=10)
@@ -1045,8 +1269,15 @@ class LASERLINKAPP(tk.Tk):
         self.MONEYSN: str = ""
         self.H_code: str = ""
         self._mscan_after_id = None
+        self._mscan_is_placeholder: bool = False
+        self._mscan_last_rejected: str = ""  # last debounce-rejected value (warn once per value)
         self._mscan_debounce_ms = 250
-        self._v_moneysn.trace_add("write", lambda *_: self._on_moneysn_changed())
+        self._mscan_last_key_t: float = 0.0
+        self._mscan_last_len: int = 0
+        # KeyRelease instead of a StringVar write-trace: programmatic set() no longer
+        # re-arms the debounce, and a burst of keystrokes arms a single timer.
+        self.ent_moneysn.bind("<KeyRelease>", self._on_moneysn_key, add=True)
+        self.ent_moneysn.bind("<<Paste>>", lambda _e: self.after_idle(lambda: self._on_moneysn_key(pasted=True)), add=True)
         self._focus_scan()
         # -------------------------
         # ---------------------------
@@ -1077,40 +1308,56 @@ class LASERLINKAPP(tk.Tk):
         self.left = ttk.Frame(self.left_canvas, style="Card.TFrame", padding=14)
         self._left_window = self.left_canvas.create_window((0, 0), window=self.left, anchor="nw")
 
-        def _on_left_config(event=None):
+        self._left_config_pending = False
+
+        def _apply_left_config():
             # Update scrollregion and width binding to holder
+            self._left_config_pending = False
             try:
                 self.left_canvas.configure(scrollregion=self.left_canvas.bbox("all"))
                 self.left_canvas.itemconfigure(self._left_window, width=self.left_holder.winfo_width())
             except Exception:
                 pass
 
+        def _on_left_config(event=None):
+            # holder + content both fire during a resize -> collapse into one bbox("all") per idle
+            if self._left_config_pending:
+                return
+            self._left_config_pending = True
+            self.after_idle(_apply_left_config)
+
         self.left.bind("<Configure>", _on_left_config)
         self.left_holder.bind("<Configure>", _on_left_config)
 
-        # Mouse wheel scrolling without showing scrollbar
-        def _bind_left_wheel(_event=None):
-            self.left_canvas.bind_all("<MouseWheel>", _on_mousewheel, add=True)
-            self.left_canvas.bind_all("<Button-4>", _on_mousewheel_linux, add=True)
-            self.left_canvas.bind_all("<Button-5>", _on_mousewheel_linux, add=True)
+        # Mouse wheel scrolling without showing scrollbar.
+        # Bound once app-wide; Enter/Leave only flip a flag (no bind_all/unbind_all per hover).
+        self._wheel_over_left = False
 
-        def _unbind_left_wheel(_event=None):
-            self.left_canvas.unbind_all("<MouseWheel>")
-            self.left_canvas.unbind_all("<Button-4>")
-            self.left_canvas.unbind_all("<Button-5>")
+        def _wheel_enter(_event=None):
+            self._wheel_over_left = True
+
+        def _wheel_leave(_event=None):
+            self._wheel_over_left = False
 
         def _on_mousewheel(event):
+            if not self._wheel_over_left:
+                return
             delta = int(-1 * (event.delta / 120))
             self.left_canvas.yview_scroll(delta, "units")
 
         def _on_mousewheel_linux(event):
+            if not self._wheel_over_left:
+                return
             if event.num == 4:
                 self.left_canvas.yview_scroll(-1, "units")
             elif event.num == 5:
                 self.left_canvas.yview_scroll(1, "units")
 
-        self.left_holder.bind("<Enter>", _bind_left_wheel)
-        self.left_holder.bind("<Leave>", _unbind_left_wheel)
+        self.left_canvas.bind_all("<MouseWheel>", _on_mousewheel, add=True)
+        self.left_canvas.bind_all("<Button-4>", _on_mousewheel_linux, add=True)
+        self.left_canvas.bind_all("<Button-5>", _on_mousewheel_linux, add=True)
+        self.left_holder.bind("<Enter>", _wheel_enter)
+        self.left_holder.bind("<Leave>", _wheel_leave)
 
         # Right card: Log
         self.right = ttk.Frame(self.content, style="Card.TFrame", padding=14)
@@ -1121,14 +1368,19 @@ class LASERLINKAPP(tk.Tk):
         # Responsive behaviour: when window width is small, hide left panel
         # and let the log occupy the full width. Restores layout when wide.
         self._left_hidden_by_width = False
+        self._resize_after_id = None
+        # threshold in pixels
+        THRESHOLD = 900
 
         def _update_layout_for_width(width: int | None = None) -> None:
             try:
                 if width is None:
                     width = self.winfo_width()
-                # threshold in pixels
-                THRESHOLD = 900
-                if int(width) < THRESHOLD:
+                narrow = int(width) < THRESHOLD
+                # same regime as current layout -> nothing to regrid
+                if narrow == self._left_hidden_by_width:
+                    return
+                if narrow:
                     if not self._left_hidden_by_width:
                         try:
                             self.left_holder.grid_remove()
@@ -1161,9 +1413,26 @@ class LASERLINKAPP(tk.Tk):
             except Exception:
                 pass
 
+        def _on_container_configure(event) -> None:
+            # debounce: drag-resize fires <Configure> per pixel; only apply the last width
+            w = event.width
+            if self._resize_after_id is not None:
+                try:
+                    self.after_cancel(self._resize_after_id)
+                except Exception:
+                    pass
+                self._resize_after_id = None
+            if (int(w) < THRESHOLD) == self._left_hidden_by_width:
+                return
+            self._resize_after_id = self.after(50, lambda: _apply_resize(w))
+
+        def _apply_resize(w: int) -> None:
+            self._resize_after_id = None
+            _update_layout_for_width(w)
+
         # Bind to container resize so layout adjusts dynamically
         try:
-            self.container.bind("<Configure>", lambda e: _update_layout_for_width(e.width))
+            self.container.bind("<Configure>", _on_container_configure)
             # apply once at startup
             _update_layout_for_width(self.winfo_width())
         except Exception:
@@ -1177,14 +1446,19 @@ class LASERLINKAPP(tk.Tk):
         # Dialog host (overlay in parent)
         self.dialog_host = DialogHost(self)
 
-        # 1) init logger hub
-        self.logger, self.log_buff = build_log_buffer("LASERLINK", max_buffer=5000)
-        # track last log object rendered (IMPORTANT for trimmed ring-buffer)
-        self._last_log_obj = None
+        # Log state
+        self._log_lines: int = 0
+        self._log_max_lines: int = 120
+
+        # 1) init logger hub: bounded deque ring, only ~2 screens are ever shown
+        self.logger, self.log_buff = build_log_buffer("LASERLINK", max_buffer=self._log_max_lines * 2)
+        # cursor = handler.seq already shown in the Text widget (IMPORTANT for trimmed ring-buffer)
+        self._log_cursor: int = 0
 
         # 2) attach CFG logging -> goes into logger -> into log_buff
         self.cfg = CFG
-        self.config_path = Path(getattr(self.cfg, "config_path", app_dir() / "config.ini"))
+        cfg_path = getattr(self.cfg, "config_path", None)
+        self.config_path = Path(cfg_path) if cfg_path is not None else app_dir() / "config.ini"
 
         # --- edit-config lock ---
         self._edit_key: str = os.environ.get(EDIT_KEY_ENV, DEFAULT_EDIT_KEY)
@@ -1195,27 +1469,15 @@ class LASERLINKAPP(tk.Tk):
         # if self.cfg is not None and hasattr(self.cfg, "set_logger"):
         #     self.cfg.set_logger(self.logger.debug)  # or .debug if you want more verbose
 
-        # 3) start UI pump to display logs from log_buff (main thread safe)
+        # 3) UI drain runs only on the Tk thread (after() poll). The log handler never calls Tk:
+        #    emit() holds logging's handler lock, and a worker blocking on Tk while the main thread
+        #    waits for that lock in append_log would deadlock. Idle ticks = one int compare.
         self.after(100, self._pump_log_buffer)
-        
-        # Log state
-        self._log_lines: int = 0
-        self._log_max_lines: int = 120
 
-        # Mock UI state
+        # Mock UI state (sequence lives on the class: _MOCK_SEQ)
         self._mock_running: bool = False
         self._mock_after_id: Optional[str] = None
         self._mock_i: int = 0
-        self._mock_seq: list[tuple[str, str]] = [
-            ("IDLE", "Ready."),
-            ("LISTENING", "Waiting for LASER trigger..."),
-            ("TESTING", "Sending to SFC..."),
-            ("PASS", "SFC: PASSED=1"),
-            ("TESTING", "Next cycle..."),
-            ("FAIL", "SFC: FAIL"),
-            ("WARN", "Retrying / Port unstable..."),
-            ("ERROR", "Timeout / No response..."),
-        ]
 
         # ---- Left panel: CONFIG summary (always visible) ----
         cfg_box = ttk.Frame(self.left, style="InCard.TFrame")
@@ -1238,11 +1500,10 @@ class LASERLINKAPP(tk.Tk):
             self.ttkLabelScan.pack(anchor="w", pady=(3, 0))
 
         # initial + periodic refresh
+        self._cfg_summary_last: tuple[str, ...] | None = None
         self._refresh_config_summary()
-        self.after(800, self._tick_config_summary)
-        self.after(800, self._tick_model_picker)
-        self.after(800, self._tick_mo_picker)
-        self.after(800, self._tick_h_code_picker)
+        self._cfg_mtime_cached = self.cfg.mtime_ns if self.cfg is not None else None
+        self.after(800, self._tick_all)
 
         ttk.Separator(self.left, style="Thin.TSeparator").pack(fill="x", pady=14)
 
@@ -1261,9 +1522,11 @@ class LASERLINKAPP(tk.Tk):
 
         # Right panel: log
         ttk.Label(self.right, text="LOG", style="Muted.TLabel").grid(row=0, column=0, sticky="w")
-        self.log = ScrolledText(self.right, height=14, wrap="word")
-        self.log.grid(row=1, column=0, sticky="nsew", pady=(10, 0))
-        self.log.configure(state="disabled")
+        # ScrolledText is created on the first drained log line (_ensure_log_widget);
+        # an empty frame holds its grid cell until then.
+        self.log: ScrolledText | None = None
+        self._log_placeholder = ttk.Frame(self.right, style="Card.TFrame")
+        self._log_placeholder.grid(row=1, column=0, sticky="nsew", pady=(10, 0))
 
         # Footer content
         ttk.Label(
@@ -1281,77 +1544,107 @@ class LASERLINKAPP(tk.Tk):
 
         # TODO
         # ---- flow runtime (NEW) ----
-        self._flow_q: "queue.SimpleQueue[tuple[str, dict]]" = queue.SimpleQueue()
+        # worker append() / UI popleft(): deque ops are atomic, no lock or Empty exception per event
+        self._flow_q: "deque[tuple[str, dict]]" = deque()
         self._flow_thread: threading.Thread | None = None
         self._flow_running = False
         self._flow_lock = threading.Lock()
         self._flow_t0 = 0.0
 
-        # poll flow events
-        self.after(50, self._poll_flow_events)
+        # flow events: producers wake the UI via after_idle (edge-triggered);
+        # the slow timer below is only a safety net.
+        self._flow_drain_scheduled = False
+        self.after(500, self._poll_flow_events)
 
         ### New Open Flow for automation
-        self._oflow_q: "queue.SimpleQueue[tuple[str, dict]]" = queue.SimpleQueue()
+        # single producer (listener thread) / single consumer (Tk): deque append/popleft, no lock
+        self._oflow_q: "deque[tuple[str, dict]]" = deque()
         self._oflow_thread: threading.Thread | None = None
-        self._oflow_stop_evt = threading.Event()
-        self._oflow_run_evt = threading.Event()
-        self._oflow_run_evt.set()  # run by default
+        self._oflow_state: int = self._OFLOW_RUN   # run by default
+        self._oflow_wake = threading.Event()        # set on state transitions; wakes a paused listener
+        # _oflow_ser is owned by the listener thread only; other threads ask it to close the port
         self._oflow_ser = None
-        self._oflow_ser_lock = threading.Lock()
+        self._oflow_reopen_evt = threading.Event()     # pause/stop -> listener closes (and later reopens) the port
+        self._oflow_released_evt = threading.Event()   # set while the listener holds no port
+        self._oflow_released_evt.set()
         self._oflow_last_port: str = ""
         self._oflow_last_baud: int = 0
+        # listener RX buffer: bytes read in blocks, split on b"\n" (only touched by the listener thread)
+        self._oflow_rxbuf = bytearray()
+        # ((id(cfg), cfg mtime_ns), COM_LASER, BAUDRATE_LASER) resolved by the listener
+        self._oflow_cfg_cache: tuple = (None, "", 0)
+        # (MONEYSN, monotonic t) of the last listener injection, for de-duplicating scanner chatter
+        self._oflow_last_injected: tuple[str, float] = ("", 0.0)
         
         # Programmatic H injection guard (skip trace debounce)
         self._mscan_programmatic: bool = False
-
-        # poll open-flow events
-        self.after(50, self._poll_open_flow_events)
+        # after_idle id of the listener-injected MONEYSN commit (coalesces bursts)
+        self._pending_commit_id: str | None = None
+
+        # open-flow events: same edge-triggered wake as the flow queue
+        self._oflow_drain_scheduled = False
+        # listener posts <<MoneySN>> to the Tk event queue; the handler drains without rescheduling
+        self.bind("<<MoneySN>>", lambda _e: self._drain_open_flow_events())
+        self.after(500, self._poll_open_flow_events)
         # Start background listener for COM_LASER (auto-fill H scan)
         self.open_flow_core_start()
 
         # status default for new UX
         self.set_status("READY", "Select/Enter MO, then scan H Box Code")
 
-        cfg = self.cfg or CFG
-        cfg.reload_if_changed()
-        com = cfg.com
-        baud = cfg.baudrate
-        self.sfc_worker = SFCComReader(com.COM_SFC, baud.BAUDRATE_SFC, log=self.append_log)
-        self.sfc_worker.start()
-
+        # SFC reader opens COM_SFC (start() blocks up to 2s) -> after first paint, not in __init__
+        self.sfc_worker = None
+        self.after_idle(self._late_init)
 
-    # TODO: refactor enable/disable inputs
-    def disable_inputs(self):
+    def _late_init(self) -> None:
         try:
-            self.cb_model.configure(state="disabled")
-        except Exception:
-            pass
+            _ = self.kpi  # build the donut right after first paint
+        except Exception as e:
+            self.append_log(f"[KPI] widget not created: {e}", logging.ERROR)
+
         try:
-            self.cb_mo.configure(state="disabled")
-        except Exception:
-            pass
+            from src.core.core_serial import SFCComReader
+
+            cfg = self.cfg or CFG
+            cfg.reload_if_changed()
+            com = cfg.com
+            baud = cfg.baudrate
+            self.sfc_worker = SFCComReader(com.COM_SFC, baud.BAUDRATE_SFC, log=self.append_log)
+            self.sfc_worker.start()
+        except Exception as e:
+            self.append_log(f"[SFC] reader not started: {e}", logging.ERROR)
+
+
+    def _set_inputs_state(self, *pairs) -> None:
+        """pairs: (widget, state); None widgets (hidden rows) are skipped."""
         try:
-            self.ent_moneysn.configure(state="disabled")
-        except Exception:
+            for w, st in pairs:
+                if w is not None:
+                    w.configure(state=st)
+        except tk.TclError:
+            # window already torn down (late DONE event) -> nothing to update
             pass
 
+    def disable_inputs(self):
+        self._set_inputs_state(
+            (self.cb_model, "disabled"),
+            (self.cb_mo, "disabled"),
+            (self.ent_moneysn, "disabled"),
+        )
+
     def enable_inputs(self):
-        try:
-            self.cb_model.configure(state="readonly")
-        except Exception:
-            pass
-        try:
+        self._set_inputs_state(
+            (self.cb_model, "readonly"),
             # MO combobox bạn để state="normal" để nhập tay
-            self.cb_mo.configure(state="normal")
-        except Exception:
-            pass
-        try:
-            self.ent_moneysn.configure(state="normal")
-        except Exception:
-            pass
+            (self.cb_mo, "normal"),
+            (self.ent_moneysn, "normal"),
+        )
         self._focus_scan()
 
     def _resolve_config_path(self, config_path: str | os.PathLike[str]) -> Path:
+        # already-absolute Path (e.g. self.config_path) -> no new Path object
+        if isinstance(config_path, Path) and config_path.is_absolute():
+            return config_path
         p = Path(config_path)
         if p.is_absolute():
             return p
@@ -1387,7 +1680,7 @@ class LASERLINKAPP(tk.Tk):
         def tick():
             if not self._mock_running:
                 return
-            code, desc = self._mock_seq[self._mock_i % len(self._mock_seq)]
+            code, desc = self._MOCK_SEQ[self._mock_i % len(self._MOCK_SEQ)]
             self._mock_i += 1
             self.set_status(code, desc)
             self.logger.info(f"[MOCK] {code}: {desc}")
@@ -1420,22 +1713,42 @@ class LASERLINKAPP(tk.Tk):
     # UI helpers
     # -----------------------------
 
+    def _set_cb_values(self, cb: ttk.Combobox, values) -> None:
+        """configure(values=...) only when the list differs from what the combobox already holds."""
+        vals = tuple(values)
+        cache = self._cb_values_cache
+        key = str(cb)
+        if cache.get(key) == vals:
+            return
+        cb.configure(values=vals)
+        cache[key] = vals
+
+    def _lower_index(self, kind: str, values) -> dict[str, str]:
+        """Case-insensitive lookup map for a picker list, cached until the list changes."""
+        vals = values if isinstance(values, tuple) else tuple(values)
+        hit = self._lower_index_cache.get(kind)
+        if hit is not None and hit[0] == vals:
+            return hit[1]
+        index = {v.lower(): v for v in vals}
+        self._lower_index_cache[kind] = (vals, index)
+        return index
+
     def _refresh_model_picker(self, *, select: str | None = None) -> None:
         if self.cfg is None:
-            self.cb_model.configure(values=[])
+            if self.cb_model is not None:
+                self._set_cb_values(self.cb_model, ())
             self._v_needpsn.set("")
             return
 
-        self.cfg.reload_if_changed()
-
         models = list(self.cfg.get_models() or [])
         cur = (select or self.cfg.get_current_selected_model() or "").strip()
 
-        self.cb_model.configure(values=models)
+        if self.cb_model is not None:
+            self._set_cb_values(self.cb_model, models)
 
         # normalize selection if possible
         if cur and models:
-            lower_map = {m.lower(): m for m in models}
+            lower_map = self._lower_index("model", models)
             cur = lower_map.get(cur.lower(), models[0])
         elif models:
             cur = models[0]
@@ -1468,26 +1781,35 @@ class LASERLINKAPP(tk.Tk):
 
     def _refresh_config_summary(self) -> None:
         snap = self.get_config_snapshot()
+        key = (
+            snap.get("COM_LASER", ""), snap.get("BAUDRATE_LASER", ""),
+            snap.get("COM_SFC", ""), snap.get("BAUDRATE_SFC", ""),
+            snap.get("COM_SCAN", ""), snap.get("BAUDRATE_SCAN", ""),
+        )
+        # same ports/bauds as already shown -> no StringVar writes
+        if key == self._cfg_summary_last:
+            return
+        self._cfg_summary_last = key
 
-        self._v_cfg_laser.set(f"LASER: {snap.get('COM_LASER','')}:{snap.get('BAUDRATE_LASER','')}")
-        self._v_cfg_sfc.set(  f"SFC:   {snap.get('COM_SFC','')}:{snap.get('BAUDRATE_SFC','')}")
+        self._v_cfg_laser.set(f"LASER: {key[0]}:{key[1]}")
+        self._v_cfg_sfc.set(  f"SFC:   {key[2]}:{key[3]}")
         if SHOW_SCAN_UI:
-            self._v_cfg_scan.set( f"SCAN:  {snap.get('COM_SCAN','')}:{snap.get('BAUDRATE_SCAN','')}")
+            self._v_cfg_scan.set( f"SCAN:  {key[4]}:{key[5]}")
 
     # -----------------------------
     # ✅ MO picker
     # -----------------------------
     def _refresh_mo_picker(self, *, select: str | None = None) -> None:
         if self.cfg is None or not hasattr(self.cfg, "get_mos"):
-            self.cb_mo.configure(values=[])
+            self._set_cb_values(self.cb_mo, ())
+            self._last_mo_values_sig = None
             self._v_mo.set("")
             self._set_mo_status("Chưa cài đặt công lệnh MO")
             self._focus_scan()
             return
 
-        self.cfg.reload_if_changed()
         mos = list(self.cfg.get_mos() or [])
-        self.cb_mo.configure(values=mos)
+        self._set_cb_values(self.cb_mo, mos)
 
         # --- 결정: AUTO_LATEST vs LOCKED ---
         if select:
@@ -1506,12 +1828,12 @@ class LASERLINKAPP(tk.Tk):
                 target = mos[-1]
 
         # normalize casing from list (case-insensitive)
+        lower_map = self._lower_index("mo", mos)
         if mos and target:
-            lower_map = {m.lower(): m for m in mos}
             target = lower_map.get(target.lower(), target)
 
         # if target missing -> fallback
-        if mos and (not target or target.lower() not in {m.lower() for m in mos}):
+        if mos and (not target or target.lower() not in lower_map):
             # AUTO mode -> fallback to latest; LOCKED mode -> keep but show warning
             if self._mo_mode_auto_latest:
                 target = mos[-1]
@@ -1520,6 +1842,12 @@ class LASERLINKAPP(tk.Tk):
                 self._set_mo_status("MO đã chọn không còn trong config → fallback sang MO mới nhất.")
                 self._selected_mo_runtime = target
 
+        # nothing changed (same list, same target, combobox still showing it) -> skip var/status/focus writes
+        sig = (tuple(mos), target or "")
+        if not select and sig == self._last_mo_values_sig and self._v_mo.get() == sig[1]:
+            return
+        self._last_mo_values_sig = sig
+
         self._v_mo.set(target or "")
 
         if mos:
@@ -1555,9 +1883,8 @@ class LASERLINKAPP(tk.Tk):
             self._v_mo_status.set("CFG chưa hỗ trợ MO (thiếu CFG.add_mo).")
             return
 
-        import re
         raw = self._v_mo.get() or ""
-        mo = re.sub(r"\s+", "", raw).strip()
+        mo = raw.translate(_WS_TRANSLATE)
         if len(mo) > 21:
             mo = mo[:21]
         self._v_mo.set(mo)
@@ -1566,17 +1893,23 @@ class LASERLINKAPP(tk.Tk):
             self._v_mo_status.set("MO rỗng hoặc không hợp lệ.")
             return
 
-        before = set(m.lower() for m in (self.cfg.get_mos() or []))
+        before = self._lower_index("mo", self.cfg.get_mos() or ())
         ok = bool(self.cfg.add_mo(mo, persist=True))  # ✅ core đã check trùng
         if not ok:
             self._v_mo_status.set("Lưu/Select MO thất bại.")
             return
 
-        existed = (mo.lower() in before)
+        canon = before.get(mo.lower())
+        existed = canon is not None
         self._mo_mode_auto_latest = False
         self._selected_mo_runtime = mo
 
-        self._refresh_mo_picker(select=mo)
+        if existed:
+            # list unchanged (core only re-selected it) -> no re-list / re-lower, just show canon casing
+            self._v_mo.set(canon)
+        else:
+            # core may replace slot mo1 rather than append -> take the full refresh path
+            self._refresh_mo_picker(select=mo)
         self._v_mo_status.set(f"MO {mo} đã tồn tại → sẵn sàng scan" if existed else f"Đã lưu MO {mo} → sẵn sàng scan")
         self.append_log(f"[OK] MO {'selected' if existed else 'saved'} -> {mo}")
         self._focus_scan()
@@ -1586,15 +1919,15 @@ class LASERLINKAPP(tk.Tk):
     # -----------------------------
     def _refresh_h_code_picker(self, *, select: str | None = None) -> None:
         if self.cfg is None or not hasattr(self.cfg, "get_h_codes"):
-            self.cb_h_code.configure(values=[])
+            self._set_cb_values(self.cb_h_code, ())
+            self._last_h_code_values_sig = None
             self._v_h_code.set("")
             self._set_h_code_status("Chưa cài đặt H Code")
             self._focus_scan()
             return
 
-        self.cfg.reload_if_changed()
         h_codes = list(self.cfg.get_h_codes() or [])
-        self.cb_h_code.configure(values=h_codes)
+        self._set_cb_values(self.cb_h_code, h_codes)
 
         # --- : AUTO_LATEST vs LOCKED ---
         if select:
@@ -1613,12 +1946,12 @@ class LASERLINKAPP(tk.Tk):
                 target = h_codes[-1]
 
         # normalize casing from list (case-insensitive)
+        lower_map = self._lower_index("h_code", h_codes)
         if h_codes and target:
-            lower_map = {h.lower(): h for h in h_codes}
             target = lower_map.get(target.lower(), target)
 
         # if target missing -> fallback
-        if h_codes and (not target or target.lower() not in {h.lower() for h in h_codes}):
+        if h_codes and (not target or target.lower() not in lower_map):
             if self._h_code_mode_auto_latest:
                 target = h_codes[-1]
             else:
@@ -1626,6 +1959,12 @@ class LASERLINKAPP(tk.Tk):
                 self._set_h_code_status("H Code đã chọn không còn trong config → fallback sang H Code mới nhất.")
                 self._selected_h_code_runtime = target
 
+        # nothing changed (same list, same target, combobox still showing it) -> skip var/status/focus writes
+        sig = (tuple(h_codes), target or "")
+        if not select and sig == self._last_h_code_values_sig and self._v_h_code.get() == sig[1]:
+            return
+        self._last_h_code_values_sig = sig
+
         self._v_h_code.set(target or "")
 
         if h_codes:
@@ -1661,9 +2000,8 @@ class LASERLINKAPP(tk.Tk):
             self._v_h_code_status.set("CFG chưa hỗ trợ H Code (thiếu CFG.add_h_code).")
             return
 
-        import re
         raw = self._v_h_code.get() or ""
-        h_code = re.sub(r"\s+", "", raw).strip()
+        h_code = raw.translate(_WS_TRANSLATE)
 
         # (tuỳ bạn) giới hạn độ dài giống MO
         if len(h_code) > 21:
@@ -1674,17 +2012,21 @@ class LASERLINKAPP(tk.Tk):
             self._v_h_code_status.set("H Code rỗng hoặc không hợp lệ.")
             return
 
-        before = set(h.lower() for h in (self.cfg.get_h_codes() or []))
+        before = self._lower_index("h_code", self.cfg.get_h_codes() or ())
         ok = bool(self.cfg.add_h_code(h_code, persist=True))  # ✅ core đã check trùng
         if not ok:
             self._v_h_code_status.set("Lưu/Select H Code thất bại.")
             return
 
-        existed = (h_code.lower() in before)
+        canon = before.get(h_code.lower())
+        existed = canon is not None
         self._h_code_mode_auto_latest = False
         self._selected_h_code_runtime = h_code
 
-        self._refresh_h_code_picker(select=h_code)
+        if existed:
+            self._v_h_code.set(canon)
+        else:
+            self._refresh_h_code_picker(select=h_code)
         self._v_h_code_status.set(
             f"H Code {h_code} đã tồn tại → sẵn sàng scan" if existed else f"Đã lưu H Code {h_code} → sẵn sàng scan"
         )
@@ -1718,33 +2060,51 @@ class LASERLINKAPP(tk.Tk):
         if self._mscan_is_placeholder:
             self._mscan_is_placeholder = False
             self._v_moneysn.set("")
+            self._mscan_last_len = 0
             self.ent_moneysn.configure(style="Scan.TEntry")
 
     def _mscan_on_focus_out(self, _e=None) -> None:
         if not (self._v_moneysn.get() or "").strip():
             self._set_mscan_placeholder()
 
-    def _on_moneysn_changed(self) -> None:
-        if getattr(self, "_mscan_is_placeholder", False):
+    def _on_moneysn_key(self, event=None, *, pasted: bool = False) -> None:
+        if self._mscan_is_placeholder:
             return
+        if event is not None and event.keysym in ("Return", "KP_Enter"):
+            return  # <Return> already commits immediately
 
         s = self._v_moneysn.get() or ""
         if ("\n" in s) or ("\r" in s):
             self._commit_moneysn_scan(immediate=True)
             return
 
-        if self._mscan_after_id:
-            try:
-                self.after_cancel(self._mscan_after_id)
-            except Exception:
-                pass
-            self._mscan_after_id = None
+        # real <<Paste>> only: a complete pasted value doesn't need the quiet window. Scanner
+        # bursts split across KeyRelease can fullmatch early ("...,NEEDPSN1" before the "2"),
+        # so they always wait for the quiet window (or end in CR/LF above).
+        grown = len(s) - self._mscan_last_len
+        self._mscan_last_len = len(s)
+        if pasted and grown > 2 and _RX_MONEYSN_LINE.fullmatch(s) is not None:
+            self._commit_moneysn_scan(immediate=True)
+            return
 
-        self._mscan_after_id = self.after(self._mscan_debounce_ms, lambda: self._commit_moneysn_scan(immediate=False))
+        # only stamp the time; the pending timer (if any) re-checks it when it fires
+        self._mscan_last_key_t = time.perf_counter()
+        if self._mscan_after_id is None:
+            self._mscan_after_id = self.after(self._mscan_debounce_ms, self._mscan_debounce_fire)
+
+    def _mscan_debounce_fire(self) -> None:
+        self._mscan_after_id = None
+        idle_ms = (time.perf_counter() - self._mscan_last_key_t) * 1000.0
+        remain = int(self._mscan_debounce_ms - idle_ms)
+        if remain > 0:
+            # still typing -> wait out the rest of the quiet window
+            self._mscan_after_id = self.after(remain, self._mscan_debounce_fire)
+            return
+        self._commit_moneysn_scan(immediate=False)
 
 
     def _commit_moneysn_scan(self, *, immediate: bool) -> None:
-        if getattr(self, "_mscan_is_placeholder", False):
+        if self._mscan_is_placeholder:
             return
 
         if self._mscan_after_id:
@@ -1755,12 +2115,26 @@ class LASERLINKAPP(tk.Tk):
             self._mscan_after_id = None
 
         raw = self._v_moneysn.get() or ""
-        cleaned = raw.replace("\r", "").replace("\n", "").strip()
+        cleaned = raw.translate(_SCAN_STRIP_CRLF).strip()
         if not cleaned:
             return
 
+        # debounce (no Enter): only auto-start on a complete "<MO>,NEEDPSNxx" shape so a
+        # half-typed value doesn't run the flow into a FAIL. Enter / listener commit always.
+        # Rejected -> tell the operator (once per value) instead of leaving it silently in the box.
+        if not immediate and _RX_MONEYSN_LINE.fullmatch(cleaned) is None:
+            if cleaned != self._mscan_last_rejected:
+                self._mscan_last_rejected = cleaned
+                warn = f"MONEYSN format not recognised: {cleaned} (expected <MO>,NEEDPSNxx). Press Enter to run anyway."
+                self.append_log(f"[SCAN] {warn}", logging.WARNING)
+                if not self._flow_running:
+                    self.set_status("WARN", warn)
+            return
+        self._mscan_last_rejected = ""
+
         self.MONEYSN = cleaned
         self._v_moneysn.set(cleaned)
+        self._mscan_last_len = len(cleaned)
         if not self._flow_running:
             self.append_log(f"[SCAN] MONEYSN -> {cleaned}")
         self._start_flow_from_ui()
@@ -1781,24 +2155,15 @@ class LASERLINKAPP(tk.Tk):
         h_code = (self._v_h_code.get() or "").strip()   # NEW input field
         moneysn = (self.MONEYSN or "").strip()
 
-        if not mo:
-            self.set_status("WARN", "MO is empty. Please select/enter MO.")
-            with self._flow_lock:
-                self._flow_running = False
-            self._focus_scan()
-            self.open_flow_core_resume(reason="flow_abort")
-            return
-
-        if not h_code:
-            self.set_status("WARN", "H_code is empty. Please scan again.")
-            with self._flow_lock:
-                self._flow_running = False
-            self._focus_scan()
-            self.open_flow_core_resume(reason="flow_abort")
-            return
-
-        if not moneysn:
-            self.set_status("WARN", "MONEYSN is empty. Please scan again.")
+        warn = (
+            "MO is empty. Please select/enter MO." if not mo else
+            "H_code is empty. Please scan again." if not h_code else
+            "MONEYSN is empty. Please scan again." if not moneysn else
+            ""
+        )
+        if warn:
+            # single abort teardown for every missing input
+            self.set_status("WARN", warn)
             with self._flow_lock:
                 self._flow_running = False
             self._focus_scan()
@@ -1814,7 +2179,8 @@ class LASERLINKAPP(tk.Tk):
             try:
                 self.flow_core(mo=mo, h_code=h_code, moneysn=moneysn)
             except Exception as e:
-                self._flow_q.put(("DONE", {"ok": False, "status": "ERROR", "desc": str(e), "detail": ""}))
+                self._flow_q.append(("DONE", {"ok": False, "status": "ERROR", "desc": str(e), "detail": ""}))
+                self._wake_flow()
             finally:
                 # worker end marker is always DONE event (flow_core cũng sẽ put DONE)
                 # Re-enable background listener after flow is done.
@@ -1824,34 +2190,50 @@ class LASERLINKAPP(tk.Tk):
         self._flow_thread.start()
 
     def flow_core(self, *, mo: str, h_code: str, moneysn: str) -> None:
+        def emit(kind: str, **payload):
+            self._flow_q.append((kind, payload))
+            self._wake_flow()
+
+        # exactly one DONE per flow (each DONE runs the whole KPI pipeline on the UI thread)
+        _already_done = False
+
+        def fail(stage: str, desc: str, detail: str = ""):
+            nonlocal _already_done
+            if _already_done:
+                return
+            _already_done = True
+            emit("DONE", ok=False, status="FAIL", stage=stage, desc=desc, detail=detail)
+
+        def okpass(stage: str, desc: str, detail: str = ""):
+            nonlocal _already_done
+            if _already_done:
+                return
+            _already_done = True
+            emit("DONE", ok=True, status="PASS", stage=stage, desc=desc, detail=detail)
+
         try:
 
             cfg = self.cfg or CFG
-            cfg.reload_if_changed()
+            # one config snapshot for the whole flow (cfg.com / cfg.baudrate each re-stat the file,
+            # and a reload mid-flow must not switch ports between steps)
             com = cfg.com
             baud = cfg.baudrate
+            com_sfc, baud_sfc = com.COM_SFC, baud.BAUDRATE_SFC
+            com_laser, baud_laser = com.COM_LASER, baud.BAUDRATE_LASER
             SFC_TX_SEC = cfg.timeout.get("SFC_TX_SEC", 2.0)
             LASER_TX_SEC = cfg.timeout.get("LASER_TX_SEC", 120.0)
 
-            def emit(kind: str, **payload):
-                self._flow_q.put((kind, payload))
-
             emit("LOG", text=f"[moneysn: WO,NEEDPSN] {moneysn}")
 
-            def fail(stage: str, desc: str, detail: str = ""):
-                emit("DONE", ok=False, status="FAIL", stage=stage, desc=desc, detail=detail)
-
             # Check MO code and the str NEEDPSN is in moneysn
-            if not moneysn.upper().__contains__("NEEDPSN") or not moneysn.upper().__contains__(mo):
+            moneysn_u = moneysn.upper()
+            if "NEEDPSN" not in moneysn_u or mo.upper() not in moneysn_u:
                 return fail("INPUT VALIDATION", "Laser sent data must contain 'NEEDPSN' or MO code example: 2790005577,NEEDPSN12", moneysn)
 
             parsed = parse_moneysn_line(moneysn, mo)
             if not parsed:
                 return fail("INPUT VALIDATION", "Invalid laser data. Expected: <MO>,NEEDPSNxx (e.g., 2790005577,NEEDPSN12)", moneysn)
 
-            def okpass(stage: str, desc: str, detail: str = ""):
-                emit("DONE", ok=True, status="PASS", stage=stage, desc=desc, detail=detail)
-
             # 1) Chck MO + H_code expiry
             # emit("STAGE", code="TESTING", desc="SFC: checking MO,H ...", stage="SFC_MO_H_TX")
             # cmd1 = f"WO={mo},MT={h_code}"
@@ -1875,24 +2257,10 @@ class LASERLINKAPP(tk.Tk):
             cmd2 = moneysn
             emit("LOG", text=f"2. Sent to SFC: {cmd2}")
 
-            expect = re.compile(r"(PASSED=1|PASSED=0|PASS|FAIL)", re.IGNORECASE)
-
-            ok2, best2, lines = self.sfc.send_and_collect(
-                "2790005467,PV61N04C3,PASSED=1",
-                timeout=5.0,
-                idle_after_last_rx=0.9,  # tăng để hốt đuôi trả trễ
-                expect=expect,
-                clear_before_send=True,
-            )
-
-            print("ok=", ok2)
-            print("best=", best2)
-            print("all lines=", lines)
-
             ok2, resp2 = send_text_and_wait_norml(
                 text=cmd2,
-                port=com.COM_SFC,
-                baudrate=baud.BAUDRATE_SFC,
+                port=com_sfc,
+                baudrate=baud_sfc,
                 write_append_crlf=True,
                 read_timeout=2.5,
                 log_callback=self.append_log,
@@ -1904,13 +2272,16 @@ class LASERLINKAPP(tk.Tk):
                 return fail("SFC_MO_NEEDPSN", "SFC returned FAIL | MO_NEEDPSN_EXPIRED | ERR", resp2)
             
             list_psn = resp2 
+            # listener was asked to drop COM_LASER at flow start; make sure it has before we open it
+            if not self._oflow_released_evt.wait(1.0):
+                return fail("LASER", "COM_LASER still held by listener", "")
             # 3) Send PSN to LASER
             emit("STAGE", code="TESTING", desc="LASER CARVING...", stage="LASER_CARVING")
             emit("LOG", text=f"3. Sent to LASER: {list_psn}")
             ok3, resp3 = send_text_and_wait(
                 text=list_psn,
-                port=com.COM_LASER,
-                baudrate=baud.BAUDRATE_LASER,
+                port=com_laser,
+                baudrate=baud_laser,
                 write_append_crlf=True,
                 read_timeout=LASER_TX_SEC,
                 log_callback=self.append_log,
@@ -1927,8 +2298,8 @@ class LASERLINKAPP(tk.Tk):
 
             ok4, resp4 = send_text_and_wait_norml(
                 laser_resp,
-                port=com.COM_SFC,
-                baudrate=baud.BAUDRATE_SFC,
+                port=com_sfc,
+                baudrate=baud_sfc,
                 write_append_crlf=True,
                 read_timeout=2.0,
                 log_callback=self.append_log,
@@ -1936,14 +2307,15 @@ class LASERLINKAPP(tk.Tk):
             
             emit("LOG", text=f"4. Received from SFC: {resp4}")
             emit("LOG", text=f"[SFC FINALIZE TO LASER] {resp4}")
-            if not resp4.endswith("PASS"):
+            # case-insensitive tail check ("...Pass" counts as terminated too)
+            if (resp4[-4:].upper() if resp4 else "") != "PASS":
                 resp4 = f"{laser_resp}PASS"
 
             emit("LOG", text=f"5. Sent to LASER: '{resp4}'")
             _not_check_ok5, resp5 = send_text_only(
                 resp4,
-                port=com.COM_LASER,
-                baudrate=baud.BAUDRATE_LASER,
+                port=com_laser,
+                baudrate=baud_laser,
                 write_append_crlf=True,
                 read_timeout=1,
                 log_callback=self.append_log,
@@ -1959,7 +2331,6 @@ class LASERLINKAPP(tk.Tk):
             # 5)  Return pass
             return okpass("DONE", "PASS END", resp4)
         except Exception as e: 
-            emit("DONE", ok=False, status="ERROR", desc=f"Flow exception: {str(e)}", detail=str(e))
             return fail("EXCEPTION", f"Flow exception: {str(e)}", str(e))
         finally:
             try:
@@ -1973,30 +2344,41 @@ class LASERLINKAPP(tk.Tk):
         - Stage A: rep_fail <= 20
         - Stage B: rep_fail > 20
         """
-        if self.rep_total < 100:
+        if self.rep_total < 100 or self.rep_fail == 0:
             return True
-        
-        # -------- Stage A --------
-        if self.rep_fail <= 20:
-            if self.rep_fail == 0:
-                return True
 
-            r = random.uniform(0, self.rep_fail)
-            return r > (self.rep_fail * 0.5)
+        # uniform(0, X) > X * k  <=>  random() > k : one Bernoulli draw per FAIL
+        # Stage A keeps 50% of FAILs, Stage B keeps 13%
+        return random.random() > (0.5 if self.rep_fail <= 20 else 0.87)
 
-        # -------- Stage B --------
-        if self.rep_total <= 0:
-            return False 
+    def _wake_flow(self) -> None:
+        """Called from the flow worker thread after an append(): schedule ONE UI drain."""
+        if self._flow_drain_scheduled:
+            return
+        self._flow_drain_scheduled = True
+        try:
+            self.after_idle(self._drain_flow_events)
+        except Exception:
+            # safety timer will pick it up
+            self._flow_drain_scheduled = False
 
-        r = random.uniform(0, self.rep_total)
-        return r > (self.rep_total * 0.87)
-    
     def _poll_flow_events(self) -> None:
+        """500 ms watchdog only: normal delivery is the after_idle wake from _wake_flow().
+        Drains on any backlog regardless of _flow_drain_scheduled: a lost wake leaves the flag
+        set, and trusting it would strand the queue (the drain resets the flag itself)."""
+        try:
+            if self._flow_q:
+                self._drain_flow_events()
+        finally:
+            self.after(500, self._poll_flow_events)
+
+    def _drain_flow_events(self) -> None:
+        self._flow_drain_scheduled = False
         try:
             while True:
                 try:
-                    kind, payload = self._flow_q.get_nowait()
-                except Exception:
+                    kind, payload = self._flow_q.popleft()
+                except IndexError:
                     break
 
                 if kind == "LOG":
@@ -2014,34 +2396,35 @@ class LASERLINKAPP(tk.Tk):
                     desc = payload.get("desc", "")
                     detail = payload.get("detail", "")
 
-                    dt = time.perf_counter() - float(getattr(self, "_flow_t0", time.perf_counter()))
+                    dt = time.perf_counter() - (self._flow_t0 or time.perf_counter())
                     self.append_log(f"[FLOW] DONE status={status} stage={stage} dt={dt:.3f}s")
 
                     # Calculate average cycletimes 
                     self.cycle_times.append(dt)
-                    avg_cycle = (sum(self.cycle_times) / len(self.cycle_times)) if self.cycle_times else 0.0
+                    avg_cycle = self.cycle_times.mean()
 
                     if detail:
                         self.append_log(f"[FLOW] DETAIL: {detail}")
 
                     self.real_total += 1 
+                    counted = True
                     if ok:
                         self.real_pass += 1
                         self.rep_pass += 1 
                         self.rep_total += 1
-                        self.kpi.update_kpi(ok, cycle_time=dt)
                         self.set_status("PASS", f"{desc} • {dt:.2f}s")
                     else:
                         self.real_fail += 1
-                        if self._should_count_fail():
+                        counted = self._should_count_fail()
+                        if counted:
                             self.rep_fail += 1
                             self.rep_total += 1
-                            self.kpi.update_kpi(ok, cycle_time=dt)
                         self.set_status("FAIL", f"{desc} • {dt:.2f}s")
 
                     # reset scan box for next
                     try:
                         self._v_moneysn.set("")
+                        self._mscan_last_len = 0
                         self.H_code = ""
                     except Exception:
                         pass
@@ -2051,9 +2434,11 @@ class LASERLINKAPP(tk.Tk):
                     with self._flow_lock:
                         self._flow_running = False
 
+                    # one KPI update per DONE: event (if counted) + absolute counters together
                     self.kpi.update_kpi(
+                        ok if counted else None,
+                        cycle_time=dt if counted else None,
                         avg_cycle=avg_cycle,
-                        cycle_times=list(self.cycle_times),
                         rep_pass=self.rep_pass,
                         rep_total=self.rep_total,
                     )
@@ -2061,102 +2446,86 @@ class LASERLINKAPP(tk.Tk):
         except Exception as e:
             # không để poll crash UI
             try:
-                self.append_log(f"[UI] _poll_flow_events error: {e}", logging.ERROR)
+                self.append_log(f"[UI] _drain_flow_events error: {e}", logging.ERROR)
             except Exception:
                 pass
-        finally:
-            self.after(50, self._poll_flow_events)
 
-    def _tick_mo_picker(self) -> None:
-        try:
-            changed = False
-            if self.cfg is not None:
-                changed = bool(self.cfg.reload_if_changed())
-            if changed:
-                self._refresh_mo_picker()
-        except Exception:
-            pass
-        finally:
-            self.after(800, self._tick_mo_picker)
-
-    def _tick_h_code_picker(self) -> None:
-        try:
-            changed = False
-            if self.cfg is not None:
-                changed = bool(self.cfg.reload_if_changed())
-            if changed:
-                self._refresh_h_code_picker()
-        except Exception:
-            pass
-        finally:
-            self.after(800, self._tick_h_code_picker)
-
-    def _tick_model_picker(self) -> None:
-        try:
-            self._refresh_model_picker()
-        except Exception:
-            pass
-        finally:
-            self.after(800, self._tick_model_picker)
-
-    def _tick_config_summary(self) -> None:
+    def _tick_all(self) -> None:
+        """
+        One 800 ms timer for config summary + model/MO/H-code pickers.
+        Config file is stat'ed once per tick; refreshers only run when its mtime moved
+        (covers external edits as well as reloads done by Save/Reload elsewhere).
+        """
         try:
             # nếu config đổi từ ngoài (hoặc sau Save) thì UI tự cập nhật
             if self.cfg is not None:
                 self.cfg.reload_if_changed()
-            self._refresh_config_summary()
+                mtime = self.cfg.mtime_ns
+                if mtime != self._cfg_mtime_cached:
+                    self._cfg_mtime_cached = mtime
+                    for fn in (
+                        self._refresh_config_summary,
+                        self._refresh_model_picker,
+                        self._refresh_mo_picker,
+                        self._refresh_h_code_picker,
+                    ):
+                        try:
+                            fn()
+                        except Exception:
+                            pass
         except Exception:
             pass
         finally:
-            self.after(800, self._tick_config_summary)
+            self.after(800, self._tick_all)
 
     def _pump_log_buffer(self):
+        try:
+            handler = getattr(self.logger, "_laserlink_handler", None)
+            # nothing logged since the last drain -> skip the lock / buffer walk
+            if handler is not None and handler.seq != self._log_cursor:
+                self._drain_logs()
+        finally:
+            self.after(100, self._pump_log_buffer)
+
+    def _drain_logs(self):
         try:
             buf = getattr(self, "log_buff", None)
             if not buf:
                 return
 
             lock = getattr(self.logger, "_laserlink_lock", None)
+            handler = getattr(self.logger, "_laserlink_handler", None)
+            if handler is None:
+                return
 
             def compute_new_lines():
                 MAX_PUSH_PER_TICK = 250
-                last_obj = getattr(self, "_last_log_obj", None)
-
-                if last_obj is None:
-                    nl = buf[-MAX_PUSH_PER_TICK:]
-                else:
-                    idx = -1
-                    for i in range(len(buf) - 1, -1, -1):
-                        if buf[i] is last_obj:
-                            idx = i
-                            break
-                    nl = buf[idx + 1:] if idx >= 0 else buf[-MAX_PUSH_PER_TICK:]
-
-                if len(nl) > MAX_PUSH_PER_TICK:
-                    nl = nl[-MAX_PUSH_PER_TICK:]
-
-                new_last = buf[-1] if buf else last_obj
-                return list(nl), new_last
+                seq = handler.seq
+                n = len(buf)
+                # lines written since the cursor, clamped to what the buffer still holds
+                k = min(seq - self._log_cursor, n, MAX_PUSH_PER_TICK)
+                # index from the tail instead of slicing: works for list and the fallback deque
+                nl = [buf[i] for i in range(n - k, n)] if k > 0 else []
+                return nl, seq
 
             if lock:
                 with lock:
-                    new_lines, new_last = compute_new_lines()
+                    new_lines, seq = compute_new_lines()
             else:
-                new_lines, new_last = compute_new_lines()
+                new_lines, seq = compute_new_lines()
 
+            self._log_cursor = seq
             if new_lines:
-                for line in new_lines:
-                    self._append_log_view(line)
-                self._last_log_obj = new_last
+                self._append_log_lines(new_lines)
 
-        finally:
-            self.after(100, self._pump_log_buffer)
+        except Exception:
+            pass
 
 
     def append_log(self, s: str, level: int = logging.INFO) -> None:
         """
         Public API: safe to call from any thread.
-        Unified flow: append_log -> logger -> log_buff -> _pump_log_buffer -> UI.
+        Unified flow: append_log -> logger -> log_buff -> _pump_log_buffer (after poll) -> UI.
         """
         msg = (s or "").rstrip("\r\n")
         try:
@@ -2169,10 +2538,23 @@ class LASERLINKAPP(tk.Tk):
         """
         UI-only: must be called in Tk main thread.
         """
-        line = (s or "").rstrip() + "\n"
+        self._append_log_lines([s])
+
+    def _append_log_lines(self, lines: list[str]) -> None:
+        """
+        UI-only: append a batch of lines with one insert / trim / see (not per line).
+        """
+        if not lines:
+            return
+        # lines that would be trimmed right away anyway -> never hand them to Tk
+        if len(lines) > self._log_max_lines:
+            lines = lines[-self._log_max_lines:]
+
+        chunk = "".join((s or "").rstrip() + "\n" for s in lines)
+        self._ensure_log_widget()
         self.log.configure(state="normal")
-        self.log.insert("end", line)
-        self._log_lines += 1
+        self.log.insert("end", chunk)
+        self._log_lines += len(lines)
 
         if self._log_lines > self._log_max_lines:
             extra = self._log_lines - self._log_max_lines
@@ -2185,21 +2567,72 @@ class LASERLINKAPP(tk.Tk):
         self.log.see("end")
         self.log.configure(state="disabled")
 
-    def _apply_status_theme(self, bg: str, big_fg: str, sub_fg: str) -> None:
-        # Update styles so whole status card changes background
-        self._style.configure("StatusCard.TFrame", background=bg)
-        self._style.configure("StatusTitle.TLabel", background=bg, foreground=sub_fg)
-        self._style.configure("StatusBig.TLabel", background=bg, foreground=big_fg)
-        self._style.configure("StatusDesc.TLabel", background=bg, foreground=sub_fg)
+    def _ensure_log_widget(self) -> None:
+        if self.log is not None:
+            return
+        # read-only ring of _log_max_lines lines: no undo stack to grow on every insert/trim
+        self.log = ScrolledText(self.right, height=14, wrap="word", undo=False, maxundo=0, autoseparators=False)
+        self.log.grid(row=1, column=0, sticky="nsew", pady=(10, 0))
+        self.log.configure(state="disabled")
+        try:
+            self._log_placeholder.destroy()
+        except Exception:
+            pass
+        self._log_placeholder = None
+
+    @property
+    def kpi(self) -> KPIWidget:
+        """KPI donut, instantiated on first use (first update / _late_init)."""
+        w = self._kpi
+        if w is None:
+            w = self._kpi = KPIWidget(self.status_card, donut_size=50)
+            w.grid(row=0, column=1, rowspan=3, sticky="e", padx=(14, 0))
+            if self._kpi_theme is not None:
+                bg, fg = self._kpi_theme
+                w.set_theme(bg=bg, text_color=fg)
+
+            # Ensure status texts stay above any overlays (e.g., KPI canvas)
+            try:
+                self.status_title.lift()
+                self.status_big.lift()
+                self.status_desc.lift()
+            except Exception:
+                pass
+        return w
+
+    def _apply_status_theme(self, theme: tuple[str, str, str]) -> None:
+        # Swap to the pre-registered per-theme styles so whole status card changes background
+        prefix = _STATUS_STYLE_PREFIX[theme]
+        self.status_card.configure(style=f"{prefix}.StatusCard.TFrame")
+        self.status_title.configure(style=f"{prefix}.StatusTitle.TLabel")
+        self.status_big.configure(style=f"{prefix}.StatusBig.TLabel")
+        self.status_desc.configure(style=f"{prefix}.StatusDesc.TLabel")
 
     def set_status(self, code: str, desc: str = ""):
-        code_u = (code or "").upper()
-        self.status_big.configure(text=code_u)
-        self.status_desc.configure(text=desc or "")
+        code_u = sys.intern((code or "").upper())
+        desc = desc or ""
+        if code_u is self._last_status_code:
+            # same code (e.g. repeated TESTING) -> at most the description changes
+            if desc != self._last_status_desc:
+                self.status_desc.configure(text=desc)
+                self._last_status_desc = desc
+            return
 
-        bg, big_fg, sub_fg = self.STATUS_THEMES.get(code_u, self.STATUS_THEMES["IDLE"])
-        self._apply_status_theme(bg, big_fg, sub_fg)
-        self.kpi.set_theme(bg=bg, text_color=big_fg)
+        self.status_big.configure(text=code_u)
+        if desc != self._last_status_desc:
+            self.status_desc.configure(text=desc)
+        self._last_status_code = code_u
+        self._last_status_desc = desc
+
+        theme = _STATUS_THEMES[code_u]
+        if theme is self._last_status_theme:
+            return  # e.g. IDLE -> READY share the same colors
+        self._last_status_theme = theme
+        self._apply_status_theme(theme)
+        bg, big_fg, _sub_fg = theme
+        self._kpi_theme = (bg, big_fg)
+        if self._kpi is not None:
+            self._kpi.set_theme(bg=bg, text_color=big_fg)
 
     # -----------------------------
     # Actions
@@ -2358,15 +2791,8 @@ class LASERLINKAPP(tk.Tk):
         if getattr(self, "_oflow_thread", None) and self._oflow_thread.is_alive():
             return
 
-        try:
-            self._oflow_stop_evt.clear()
-        except Exception:
-            pass
-
-        try:
-            self._oflow_run_evt.set()
-        except Exception:
-            pass
+        self._oflow_state = self._OFLOW_RUN
+        self._oflow_wake.set()
 
         self._oflow_thread = threading.Thread(target=self._open_flow_core_loop, daemon=True)
         self._oflow_thread.start()
@@ -2375,24 +2801,19 @@ class LASERLINKAPP(tk.Tk):
         except Exception:
             pass
 
-    def open_flow_core_pause(self, reason: str = "") -> None:
-        """Pause listener and close serial immediately so COM_LASER is free."""
+    def open_flow_core_pause(self, reason: str = "", *, release_port: bool = True) -> None:
+        """Pause listener. release_port=True: it also closes COM_LASER on its next loop
+        (<= one read timeout) so flow_core can open it; False: port stays open, reads stop."""
         try:
-            self._oflow_run_evt.clear()
+            if self._oflow_state == self._OFLOW_STOP:
+                return
+            self._oflow_state = self._OFLOW_PAUSE
+            if release_port:
+                self._oflow_reopen_evt.set()
+            self._oflow_wake.set()
         except Exception:
             return
 
-        try:
-            with self._oflow_ser_lock:
-                if self._oflow_ser is not None:
-                    try:
-                        self._oflow_ser.close()
-                    except Exception:
-                        pass
-                    self._oflow_ser = None
-        except Exception:
-            pass
-
         if reason:
             try:
                 self.append_log(f"[OPEN_FLOW] Paused ({reason}).")
@@ -2402,49 +2823,85 @@ class LASERLINKAPP(tk.Tk):
     def open_flow_core_resume(self, reason: str = "") -> None:
         """Resume listener (it will reopen COM_LASER on next loop)."""
         try:
-            self._oflow_run_evt.set()
+            if self._oflow_state != self._OFLOW_STOP:
+                self._oflow_state = self._OFLOW_RUN
+                self._oflow_wake.set()
             self._v_moneysn.set("")
+            self._mscan_last_len = 0
         except Exception:
             return
         if reason:
             try:
                 self.append_log(f"[OPEN_FLOW] Resumed ({reason}).")
                 self._v_moneysn.set("")
+                self._mscan_last_len = 0
             except Exception:
                 pass
 
+    def _oflow_resume_reading(self) -> None:
+        """Let the listener read again; unlike open_flow_core_resume() the scan entry is untouched."""
+        if self._oflow_state != self._OFLOW_STOP:
+            self._oflow_state = self._OFLOW_RUN
+            self._oflow_wake.set()
+
     def open_flow_core_stop(self) -> None:
         """Stop listener thread and close serial."""
         try:
-            self._oflow_stop_evt.set()
-            self._oflow_run_evt.set()
-        except Exception:
-            pass
-
-        try:
-            with self._oflow_ser_lock:
-                if self._oflow_ser is not None:
-                    try:
-                        self._oflow_ser.close()
-                    except Exception:
-                        pass
-                    self._oflow_ser = None
+            self._oflow_state = self._OFLOW_STOP
+            self._oflow_reopen_evt.set()
+            self._oflow_wake.set()
         except Exception:
             pass
 
     def _open_flow_core_loop(self) -> None:
         """Background loop: keep COM_LASER opened, read lines, emit H into _oflow_q."""
-        last_err_ts = 0.0
+        last_err_ts = float("-inf")  # monotonic clock: immune to wall-clock/NTP steps
+        RX_PARTIAL_IDLE_SEC = 0.75  # un-terminated frame is flushed after this much silence
+        rx_last_t = 0.0
+        paused = False
+
+        def close_port() -> None:
+            ser = self._oflow_ser
+            self._oflow_ser = None
+            if ser is not None:
+                try:
+                    ser.close()
+                except Exception:
+                    pass
+            self._oflow_released_evt.set()
+
+        # bound once: these run every iteration
+        reopen_evt = self._oflow_reopen_evt
+        wake = self._oflow_wake
+        RUN, STOP = self._OFLOW_RUN, self._OFLOW_STOP
 
         while True:
-            if self._oflow_stop_evt.is_set():
+            state = self._oflow_state
+            if state == STOP:
                 break
 
-            if not self._oflow_run_evt.is_set():
-                time.sleep(0.10)
+            if reopen_evt.is_set():
+                reopen_evt.clear()
+                close_port()
+
+            if state != RUN:
+                # paused: block until a transition (resume/stop/release) instead of polling
+                paused = True
+                wake.wait(0.1)
+                wake.clear()
                 continue
+            if paused:
+                paused = False
+                # bytes that arrived while paused are stale (a close/reopen used to drop them)
+                ser = self._oflow_ser
+                if ser is not None:
+                    try:
+                        ser.reset_input_buffer()
+                    except Exception:
+                        pass
+                self._oflow_rxbuf.clear()
 
-            if getattr(self, "_flow_running", False):
+            if self._flow_running:
                 # Flow should have called pause, but double-safety
                 self.open_flow_core_pause(reason="flow_running")
                 time.sleep(0.10)
@@ -2457,59 +2914,80 @@ class LASERLINKAPP(tk.Tk):
                 except Exception:
                     pass
 
-                port = str(getattr(getattr(cfg, "com", None), "COM_LASER", "") or "")
-                baud = int(getattr(getattr(cfg, "baudrate", None), "BAUDRATE_LASER", 9600) or 9600)
+                # one stat per loop (above); port/baud re-resolved only when the config mtime moved
+                key = (id(cfg), cfg.mtime_ns)
+                cached_key, port, baud = self._oflow_cfg_cache
+                if key != cached_key:
+                    com_ns = getattr(cfg, "com", None)
+                    baud_ns = getattr(cfg, "baudrate", None)
+                    port = str(getattr(com_ns, "COM_LASER", "") or "")
+                    baud = int(getattr(baud_ns, "BAUDRATE_LASER", 9600) or 9600)
+                    self._oflow_cfg_cache = (key, port, baud)
 
                 if not port:
                     time.sleep(0.25)
                     continue
 
-                # Ensure serial opened with latest port/baud
-                with self._oflow_ser_lock:
-                    need_open = (
-                        self._oflow_ser is None or
-                        port != self._oflow_last_port or
-                        baud != self._oflow_last_baud
+                # Ensure serial opened with latest port/baud (listener-owned, no lock)
+                ser = self._oflow_ser
+                if ser is None or port != self._oflow_last_port or baud != self._oflow_last_baud:
+                    close_port()
+                    # short timeouts: the loop gets back to stop/pause checks within ~50ms
+                    ser = serial.Serial(
+                        port=port,
+                        baudrate=baud,
+                        timeout=0.05,
+                        inter_byte_timeout=0.01,
+                        exclusive=True,
                     )
-
-                    if need_open:
-                        if self._oflow_ser is not None:
-                            try:
-                                self._oflow_ser.close()
-                            except Exception:
-                                pass
-                            self._oflow_ser = None
-
-                        self._oflow_ser = serial.Serial(
-                            port=port,
-                            baudrate=baud,
-                            timeout=0.750,
-                        )
-                        try:
-                            self._oflow_ser.reset_input_buffer()
-                            self._oflow_ser.reset_output_buffer()
-                        except Exception:
-                            pass
-                        self._oflow_last_port = port
-                        self._oflow_last_baud = baud
-
-                    ser = self._oflow_ser
-
-                raw = b""
-                try:
-                    raw = ser.readline() if ser is not None else b""
-                except Exception:
-                    raw = b""
-
+                    self._oflow_ser = ser
+                    self._oflow_released_evt.clear()
+                    try:
+                        ser.reset_input_buffer()
+                        ser.reset_output_buffer()
+                    except Exception:
+                        pass
+                    self._oflow_rxbuf.clear()
+                    self._oflow_last_port = port
+                    self._oflow_last_baud = baud
+
+                # Block read: take everything already waiting in one call; only when the
+                # driver is empty block on a single byte (up to the port timeout).
+                # A complete frame still sitting in the buffer is served without reading.
+                rxbuf = self._oflow_rxbuf
+                i = rxbuf.find(b"\n")
+                if i < 0:
+                    chunk = b""
+                    try:
+                        if ser is not None:
+                            n = ser.in_waiting
+                            chunk = ser.read(n) if n else ser.read(1)
+                    except Exception:
+                        chunk = b""
+
+                    if chunk:
+                        rxbuf += chunk
+                        rx_last_t = time.monotonic()
+                        i = rxbuf.find(b"\n")
+                        if i < 0 and len(rxbuf) > 4096:
+                            # no terminator in a long burst -> drop garbage
+                            rxbuf.clear()
+                    elif rxbuf and time.monotonic() - rx_last_t >= RX_PARTIAL_IDLE_SEC:
+                        # line idle with a partial frame pending -> same as the old readline() timing out
+                        i = len(rxbuf)
+
+                if i < 0:
+                    continue
+                raw = bytes(rxbuf[:i]).strip(b" \t\r\n\x00")
+                del rxbuf[:i + 1]
                 if not raw:
+                    # bare delimiter / whitespace-only frame: nothing to decode
                     continue
 
-                try:
-                    line = raw.decode("utf-8", errors="ignore")
-                except Exception:
-                    line = str(raw)
+                # trimmed on bytes above, then one ASCII decode (MONEYSN frames are plain ASCII;
+                # errors="ignore" never raises)
+                cleaned = raw.decode("ascii", "ignore")
 
-                cleaned = line.replace("\r", "").replace("\n", "").strip()
                 if not cleaned:
                     continue
 
@@ -2517,43 +2995,66 @@ class LASERLINKAPP(tk.Tk):
                 # if cleaned[:1].upper() != "H":
                 #     continue
 
-                # Free COM_LASER immediately, then notify UI
-                self.open_flow_core_pause(reason="MONEYSN_detected")
+                # Stop reading, then notify UI. The port stays open: the flow's own
+                # pause(flow_start) releases it, and a dropped scan resumes without a reopen.
+                self.open_flow_core_pause(reason="MONEYSN_detected", release_port=False)
                 try:
-                    # self._oflow_q.put(("H", {"h": cleaned}))
-                    self._oflow_q.put(("MONEYSN", {"moneysn": cleaned}))
+                    # self._oflow_q.append(("H", {"h": cleaned}))
+                    self._oflow_q.append(("MONEYSN", {"moneysn": cleaned}))
+                    self._wake_open_flow()
                 except Exception:
                     pass
 
             except Exception as e:
-                now = time.time()
+                now = time.monotonic()
                 if now - last_err_ts > 2.0:
                     last_err_ts = now
                     try:
-                        self._oflow_q.put(("ERR", {"err": str(e)}))
+                        self._oflow_q.append(("ERR", {"err": str(e)}))
+                        self._wake_open_flow()
                     except Exception:
                         pass
                 time.sleep(0.25)
 
         # final close
+        close_port()
+
+    def _wake_open_flow(self) -> None:
+        """Called from the COM_LASER listener thread after an append(): post ONE <<MoneySN>> drain."""
+        if self._oflow_drain_scheduled:
+            return
+        self._oflow_drain_scheduled = True
         try:
-            with self._oflow_ser_lock:
-                if self._oflow_ser is not None:
-                    try:
-                        self._oflow_ser.close()
-                    except Exception:
-                        pass
-                    self._oflow_ser = None
+            self.event_generate("<<MoneySN>>", when="tail")
         except Exception:
-            pass
+            try:
+                self.after_idle(self._drain_open_flow_events)
+            except Exception:
+                # window gone / Tk not ready -> the 500ms watchdog picks it up
+                self._oflow_drain_scheduled = False
 
     def _poll_open_flow_events(self) -> None:
+        # idle watchdog tick: one truth test + reschedule, no try/drain scaffolding.
+        # Backlog -> drain even if a wake is "scheduled": a lost <<MoneySN>> leaves the flag set
+        # forever, and the listener (paused on that frame) would never be resumed.
+        if not self._oflow_q:
+            self.after(500, self._poll_open_flow_events)
+            return
+        try:
+            self._drain_open_flow_events()
+        finally:
+            self.after(500, self._poll_open_flow_events)
+
+    def _drain_open_flow_events(self) -> None:
         """Main-thread pump for open_flow_core events."""
+        MAX_EVENTS_PER_TICK = 200  # bounded drain: a noisy port can't starve the Tk loop
+        DUP_WINDOW_SEC = 0.5       # same MONEYSN again within this window = scanner chatter
+        self._oflow_drain_scheduled = False
         try:
-            while True:
+            for _ in range(MAX_EVENTS_PER_TICK):
                 try:
-                    kind, payload = self._oflow_q.get_nowait()
-                except Exception:
+                    kind, payload = self._oflow_q.popleft()
+                except IndexError:
                     break
 
                 if kind == "ERR":
@@ -2566,23 +3067,38 @@ class LASERLINKAPP(tk.Tk):
                     if not moneysn:
                         continue
 
-                    if getattr(self, "_flow_running", False):
+                    # repeat of the last injection = scanner chatter. (No in-batch check: the
+                    # listener pauses after every frame, so a batch never holds two MONEYSN.)
+                    now = time.monotonic()
+                    prev, prev_t = self._oflow_last_injected
+                    if moneysn == prev and now - prev_t < DUP_WINDOW_SEC:
+                        # The listener paused itself on this frame. If no flow / pending commit
+                        # will resume it, restart it here -- without open_flow_core_resume(),
+                        # which would clear the entry the first injection just filled.
+                        if not self._flow_running and self._pending_commit_id is None:
+                            self._oflow_resume_reading()
                         continue
 
+                    if self._flow_running:
+                        continue
+
+                    self._oflow_last_injected = (moneysn, now)
                     self._inject_moneysn_from_open_flow(moneysn)
 
         except Exception as e:
             try:
-                self.append_log(f"[UI] _poll_open_flow_events error: {e}", logging.ERROR)
+                self.append_log(f"[UI] _drain_open_flow_events error: {e}", logging.ERROR)
             except Exception:
                 pass
-        finally:
-            self.after(50, self._poll_open_flow_events)
+        else:
+            # bounded drain left items behind -> continue on the next idle pass
+            if self._oflow_q:
+                self._wake_open_flow()
 
     def _inject_moneysn_from_open_flow(self, moneysn: str) -> None:
         """Fill MONEYSN scan entry from COM_LASER listener, then start the existing flow."""
         try:
-            if getattr(self, "_mscan_is_placeholder", False):
+            if self._mscan_is_placeholder:
                 self._mscan_is_placeholder = False
                 try:
                     self.ent_moneysn.configure(style="Scan.TEntry")
@@ -2597,4 +3113,14 @@ class LASERLINKAPP(tk.Tk):
         finally:
             self._mscan_programmatic = False
 
+        # commit on the next idle pass so paint/input run first; a burst collapses to one commit
+        if self._pending_commit_id:
+            try:
+                self.after_cancel(self._pending_commit_id)
+            except Exception:
+                pass
+        self._pending_commit_id = self.after_idle(self._run_pending_commit)
+
+    def _run_pending_commit(self) -> None:
+        self._pending_commit_id = None
         self._commit_moneysn_scan(immediate=True)
\ No newline at end of file
@@ -1,11 +1,17 @@
 # src.link_main.py
-from src import *
+import os
+import sys
 # from src.core import *
-from src.gui.gui_H_code_trigger import LASERLINKAPP as LASERLINK_LASER_SEND_H_CODE_TRIGGER
-from src.gui.gui_Laser_NeedPSN_trigger import LASERLINKAPP as LASERLINK_LASER_SEND_NEEDPSN_TRIGGER
+# Chỉ import GUI được chạy: biến thể H code (--h-code) load lazy trong link_main()
 def link_main():
-    app = LASERLINK_LASER_SEND_NEEDPSN_TRIGGER()
-    
+    if "--h-code" in sys.argv:
+        from src.gui.gui_H_code_trigger import LASERLINKAPP as LASERLINK_LASER_SEND_H_CODE_TRIGGER
+        app_cls = LASERLINK_LASER_SEND_H_CODE_TRIGGER
+    else:
+        from src.gui.gui_Laser_NeedPSN_trigger import LASERLINKAPP as LASERLINK_LASER_SEND_NEEDPSN_TRIGGER
+        app_cls = LASERLINK_LASER_SEND_NEEDPSN_TRIGGER
+    app = app_cls()
+
     if ("--mock" in sys.argv) or (os.environ.get("LASERLINK_MOCK_UI", "").strip() == "1"):
         app.init_mock_ui(True)
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
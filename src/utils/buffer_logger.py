@@ -3,30 +3,42 @@ from __future__ import annotations
 import sys
 import logging
 import threading
-from typing import List, Tuple
+from collections import deque
+from typing import Deque, List, Tuple, Union
 
 _fmt = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
 _datefmt = "%Y-%m-%d %H:%M:%S"
 
 class ListLogHandler(logging.Handler):
-    def __init__(self, buffer: List[str], max_buffer: int = 500, lock: threading.RLock | None = None):
+    """
+    Append formatted records to `buffer`.
+    A deque(maxlen=...) trims itself in O(1); a plain list is trimmed to max_buffer by slicing.
+    """
+
+    def __init__(self, buffer: Union[Deque[str], List[str]], max_buffer: int = 500, lock: threading.RLock | None = None):
         super().__init__()
         self._buffer = buffer
         self._max_buffer = max_buffer
+        self._self_trimming = getattr(buffer, "maxlen", None) is not None
         self._lock = lock or threading.RLock()
+        # records ever appended (monotonic, survives trimming) -> readers keep a cursor on it.
+        # emit() runs under logging's handler lock on the caller's thread: never call Tk from here,
+        # the GUI polls seq from its own after() loop.
+        self.seq: int = 0
 
     def emit(self, record: logging.LogRecord):
         try:
             msg = self.format(record)
             with self._lock:
                 self._buffer.append(msg)
-                if self._max_buffer and len(self._buffer) > self._max_buffer:
+                self.seq += 1
+                if not self._self_trimming and self._max_buffer and len(self._buffer) > self._max_buffer:
                     extra = len(self._buffer) - self._max_buffer
                     del self._buffer[:extra]
         except Exception:
             self.handleError(record)
 
-def build_log_buffer(name: str = "LASERLINK", level=logging.DEBUG, *, max_buffer: int = 500) -> Tuple[logging.Logger, List[str]]:
+def build_log_buffer(name: str = "LASERLINK", level=logging.DEBUG, *, max_buffer: int = 500) -> Tuple[logging.Logger, Deque[str]]:
     logger = logging.getLogger(name=name)
 
     if getattr(logger, "_laserlink_inited", False):
@@ -35,7 +47,7 @@ def build_log_buffer(name: str = "LASERLINK", level=logging.DEBUG, *, max_buffer
     logger.setLevel(level)
     logger.propagate = False
 
-    log_buffer: List[str] = []
+    log_buffer: Deque[str] = deque(maxlen=max_buffer or None)
     lock = threading.RLock()
 
     fmt = logging.Formatter(fmt=_fmt, datefmt=_datefmt)
@@ -54,6 +66,7 @@ def build_log_buffer(name: str = "LASERLINK", level=logging.DEBUG, *, max_buffer
     logger._laserlink_inited = True
     logger._laserlink_buffer = log_buffer
     logger._laserlink_lock = lock   # <-- GUI sẽ dùng lock này
+    logger._laserlink_handler = list_handler   # <-- .seq cho GUI cursor
 
     return logger, log_buffer
 
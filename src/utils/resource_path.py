@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 import os
 import sys
 from pathlib import Path
@@ -20,6 +21,7 @@ ASSETS_PATH = SRC_PATH / "assets"
 ICONS_PATH = ASSETS_PATH / "icons"
 IMAGES_PATH = ASSETS_PATH / "images"
 
+@lru_cache(maxsize=1)
 def app_dir() -> Path:
     """Folder cài đặt: nơi đặt entry.py (dev) hoặc nơi đặt exe (bundled)."""
     if getattr(sys, "frozen", False):
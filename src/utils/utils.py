@@ -1,12 +1,52 @@
 # src.utils.utils.py
+import io
+import os
+import sys
 from PIL import Image
 
+# kích thước nhúng trong .ico (module-level: không tạo lại mỗi lần gọi)
+SIZES = ((16, 16), (24, 24), (32, 32), (48, 48), (64, 64), (128, 128), (256, 256))
+
+def _ico_pyramid(img: Image.Image):
+    """256 -> 128 -> ... -> 16: mỗi bậc resize từ bậc trước, không resample lại từ ảnh gốc.
+    Chỉ cho ảnh vuông (ảnh lệch tỉ lệ -> None, để Pillow tự thumbnail giữ tỉ lệ)."""
+    if img.width != img.height:
+        return None
+    top = min(img.width, 256)
+    cur = img.convert("RGBA")
+    frames = []
+    for s in sorted((w for w, _ in SIZES if w <= top), reverse=True):
+        if cur.width != s:
+            cur = cur.resize((s, s), Image.Resampling.LANCZOS)
+        frames.append(cur)
+    return frames or None
+
+def png_to_ico_bytes(src_path_file: str) -> bytes:
+    """Encode PNG -> ICO in memory (no file write) for in-process callers."""
+    buf = io.BytesIO()
+    with Image.open(src_path_file) as img:
+        frames = _ico_pyramid(img)
+        if frames:
+            frames[0].save(buf, format="ICO", sizes=SIZES, append_images=frames[1:])
+        else:
+            img.save(buf, format="ICO", sizes=SIZES)
+    return buf.getvalue()
+
 def png_to_ico(src_path_file: str, out_path_file: str):
-    img = Image.open(src_path_file)
-    sizes = [(16, 16),(24, 24), (32, 32), (48, 48), (64, 64), (128, 128), (256, 256)]
-    img.save(out_path_file, sizes=sizes)
-
-png_to_ico(
-    src_path_file="/home/te/Documents/LaserLink/src/assets/icons/laser-link-app-icon.png",
-    out_path_file="/home/te/Documents/LaserLink/src/assets/icons/laser-link-app-icon.ico",
-)
\ No newline at end of file
+    # .ico mới hơn .png -> không cần encode lại
+    try:
+        if os.stat(out_path_file).st_mtime_ns >= os.stat(src_path_file).st_mtime_ns:
+            return
+    except FileNotFoundError:
+        pass
+
+    data = png_to_ico_bytes(src_path_file)
+    with open(out_path_file, "wb") as f:
+        f.write(data)
+
+if __name__ == "__main__":
+    # python -m src.utils.utils <icon.png> [icon.ico]
+    _icons = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "icons")
+    _src = sys.argv[1] if len(sys.argv) > 1 else os.path.join(_icons, "laser-link-app-icon.png")
+    _out = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(_src)[0] + ".ico"
+    png_to_ico(src_path_file=_src, out_path_file=_out)